@@ -19,29 +19,106 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import os
 import logging
+import re
+from functools import cached_property
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Dict, Optional, Tuple
+from dotenv import dotenv_values, find_dotenv
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file
-# load_dotenv()  # Moved to Config.__init__ to avoid import-time side effects
+# Parsed .env files per absolute path, with the (mtime, size) of the file
+# they came from; a file is only parsed again once it has changed on disk,
+# and the new result replaces the old one
+_DOTENV_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Optional[str]]]] = {}
+
+def _load_dotenv_cached(env_path: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """Parse a .env file, reusing the previous result while the file is unchanged"""
+    # Without a path, search for .env the same way load_dotenv() does
+    env_path = env_path or find_dotenv()
+    if not env_path:
+        return {}
+    try:
+        stat = os.stat(env_path)
+    except OSError:
+        return {}
+    key = os.path.abspath(env_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _DOTENV_CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    values = dotenv_values(env_path)
+    _DOTENV_CACHE[key] = (stamp, values)
+    return values
+
+# A KEY=VALUE line of a .env file, matched across the whole text at once.
+# Blank and comment lines don't match; surrounding whitespace is dropped
+_ENV_LINE_RE = re.compile(r'^[ \t\r\f\v]*(?![#\s])([^=\n]*)=([^\n]*?)[ \t\r\f\v]*$', re.MULTILINE)
+
+# Comment block save_to_env starts every .env file with
+_ENV_HEADER = (
+    "# Letta Chat Client Configuration\n"
+    "# Generated automatically - safe to edit\n"
+    "\n"
+)
+
+# KEY=VALUE pairs save_to_env last read or wrote, per absolute path, with
+# the (mtime, size) of the file they belong to
+_ENV_FILE_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+def _read_env_file(env_path: Path) -> Optional[Dict[str, str]]:
+    """Get the KEY=VALUE pairs in a .env file, or None if it doesn't exist"""
+    try:
+        stat = env_path.stat()
+    except FileNotFoundError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    # save_to_env uses a relative path, so key by where it points right now
+    key = os.path.abspath(env_path)
+    cached = _ENV_FILE_CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    values = dict(_ENV_LINE_RE.findall(env_path.read_text()))
+    _ENV_FILE_CACHE[key] = (stamp, values)
+    return values
 
 class Config:
     """Configuration settings - idempotent"""
 
-    def __init__(self):
-        # Load environment variables from .env file
-        load_dotenv()
+    # Settings letta_client_config and is_valid are built from
+    _CONNECTION_FIELDS = frozenset({"letta_server_url", "letta_api_token"})
+
+    def __init__(self, env_path: Optional[str] = None):
+        # Load environment variables from .env file; like load_dotenv(),
+        # variables already set in the environment win
+        for name, value in _load_dotenv_cached(env_path).items():
+            if value is not None:
+                os.environ.setdefault(name, value)
 
         self.letta_server_url = os.getenv("LETTA_SERVER_URL", "https://your-letta-server.com:8283")
         self.letta_api_token = os.getenv("LETTA_API_TOKEN", "")
         self.display_name = os.getenv("DISPLAY_NAME", "User")
         self.default_agent_id = os.getenv("DEFAULT_AGENT_ID", "")
 
+    def __setattr__(self, name, value):
+        # Changing a setting drops the cached values built from it
+        if name in self._CONNECTION_FIELDS:
+            self.__dict__.pop("letta_client_config", None)
+            self.__dict__.pop("is_valid", None)
+        super().__setattr__(name, value)
+
+    @cached_property
+    def is_valid(self) -> bool:
+        """Whether the required settings are present, checked once until one changes"""
+        return self._check_required()
+
     def validate(self) -> bool:
         """Validate required configuration"""
+        return self.is_valid
+
+    def _check_required(self) -> bool:
+        """Check that the server URL and API token are set"""
         if not self.letta_api_token:
             logger.error("LETTA_API_TOKEN is required")
             return False
@@ -52,44 +129,61 @@ class Config:
 
         return True
 
-    def get_letta_client_config(self) -> dict:
-        """Get configuration for Letta client"""
+    @cached_property
+    def letta_client_config(self) -> dict:
+        """Configuration for Letta client, built once until a setting changes"""
         return {
             "base_url": self.letta_server_url,
             "token": self.letta_api_token
         }
 
+    def get_letta_client_config(self) -> dict:
+        """Get configuration for Letta client"""
+        return self.letta_client_config
+
     def save_to_env(self, **kwargs) -> None:
         """Save configuration to .env file - idempotent"""
         env_path = Path(".env")
 
         # Read existing .env if it exists
         existing_vars = {}
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        existing_vars[key] = value
+        saved_vars = _read_env_file(env_path)
+        if saved_vars is not None:
+            # Nothing to write when every value is already saved as given,
+            # but still make sure the file is private like a fresh write
+            if all(saved_vars.get(key) == value for key, value in kwargs.items()):
+                if hasattr(os, 'chmod'):
+                    os.chmod(env_path, 0o600)
+                return
+            existing_vars.update(saved_vars)
 
         # Update with new values
         existing_vars.update(kwargs)
 
-        # Write back to .env
-        with open(env_path, 'w') as f:
-            f.write("# Letta Chat Client Configuration\n")
-            f.write("# Generated automatically - safe to edit\n\n")
-            for key, value in existing_vars.items():
-                # Quote values that contain spaces, #, or =
-                if any(char in str(value) for char in [' ', '#', '=']):
-                    f.write(f'{key}="{value}"\n')
-                else:
-                    f.write(f"{key}={value}\n")
-        
+        # Build the whole file in memory
+        lines = []
+        # Values as they will read back from the file
+        written_vars = {}
+        for key, value in existing_vars.items():
+            # Quote values that contain spaces, #, or =
+            if any(char in str(value) for char in [' ', '#', '=']):
+                written_vars[key] = f'"{value}"'
+            else:
+                written_vars[key] = str(value)
+            lines.append(f"{key}={written_vars[key]}")
+
+        # Write once to a temporary file and swap it in, so .env is never
+        # left half-written
+        tmp_path = env_path.with_name(env_path.name + ".tmp")
+        tmp_path.write_text(_ENV_HEADER + "".join(line + "\n" for line in lines))
+
         # Set secure permissions on POSIX systems
         if hasattr(os, 'chmod'):
-            os.chmod(env_path, 0o600)  # Read/write for owner only
+            os.chmod(tmp_path, 0o600)  # Read/write for owner only
+        # The rename keeps the temporary file's mtime and size
+        stat = tmp_path.stat()
+        os.replace(tmp_path, env_path)
+        _ENV_FILE_CACHE[os.path.abspath(env_path)] = ((stat.st_mtime_ns, stat.st_size), written_vars)
 
 # Global config instance
 config = Config()
@@ -24,8 +24,8 @@ import asyncio
 import sys
 from pathlib import Path
 
-# Add the current directory to Python path
-sys.path.insert(0, str(Path(__file__).parent))
+# simple_chat lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from simple_chat import main
 
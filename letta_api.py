@@ -18,8 +18,15 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
+import atexit
 import logging
+import re
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, AsyncGenerator, Optional
+import httpx
 from letta_client import Letta as LettaSDK
 from letta_client import MessageCreate
 from config import config
@@ -27,16 +34,83 @@ from config import config
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Keep-alive pool shared by every request a client makes
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
+HTTP_TIMEOUT = 60.0
+
+# How long a fetched agent list is reused before asking the server again
+AGENTS_CACHE_TTL = 5.0
+
+# Reasoning chunk type -> (attribute holding the text, display prefix)
+_REASONING_MAP = {
+    'reasoning_message': ('reasoning', '__REASONING__:'),
+    'hidden_reasoning_message': ('hidden_reasoning', '[Hidden Thinking] '),
+}
+
+# Streamed text is coalesced into yields of up to this many characters or
+# this much time, whichever comes first; text is never held back once the
+# stream has nothing more queued
+STREAM_BATCH_CHARS = 32
+STREAM_BATCH_NS = 16_000_000
+
+# Marks the end of a stream forwarded from the stream worker thread
+_STREAM_END = object()
+
+# SDK/httpx errors often wrap the SSLError, leaving only its message
+_SSL_ERROR_RE = re.compile(r'CERTIFICATE_VERIFY_FAILED|SSL')
+
+def _is_ssl_error(e: Exception) -> bool:
+    """Check whether an exception is (or wraps) an SSL/certificate failure"""
+    if isinstance(e, ssl.SSLError) or isinstance(e.__cause__, ssl.SSLError):
+        return True
+    return _SSL_ERROR_RE.search(str(e)) is not None
+
 class LettaClient:
     """Simple Letta API client"""
 
     def __init__(self):
-        # Create client with proper configuration
-        self.client = LettaSDK(
-            base_url=config.letta_server_url,
-            token=config.letta_api_token
-        )
+        self._base_url = config.letta_server_url
+        self._token = config.letta_api_token
+        # SDK client and the HTTP session backing it, created together on
+        # first use
+        self._sdk: Optional[LettaSDK] = None
+        self._http: Optional[httpx.Client] = None
         self.current_agent_id = config.default_agent_id or ""
+        # Last successful list_agents() result and when it was fetched
+        self._agents_cache: Optional[List[dict]] = None
+        self._agents_cache_ts = 0.0
+        # The SDK stream is blocking, so it is drained on one long-lived
+        # worker thread instead of on the event loop
+        self._stream_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="letta-stream")
+        # Guards building the SDK client when first calls race on threads
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """SDK client, built on first use rather than at construction"""
+        sdk = self._sdk
+        if sdk is not None:
+            return sdk
+        with self._client_lock:
+            # Another thread may have built it while we waited for the lock
+            if self._sdk is None:
+                # One persistent HTTP session so calls reuse the TCP/TLS connection
+                self._http = httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, follow_redirects=True)
+                # Create client with proper configuration
+                self._sdk = LettaSDK(
+                    base_url=self._base_url,
+                    token=self._token,
+                    httpx_client=self._http
+                )
+            return self._sdk
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections and the stream worker"""
+        # No cancel_futures (Python 3.9+): a stream still queued behind the
+        # worker has had its stop event set by its consumer and ends at once
+        self._stream_executor.shutdown(wait=False)
+        if self._http is not None:
+            self._http.close()
 
     def test_connection(self) -> bool:
         """Test connection to Letta server"""
@@ -45,7 +119,7 @@ class LettaClient:
             return True
         except Exception as e:
             # Handle SSL certificate errors gracefully
-            if "CERTIFICATE_VERIFY_FAILED" in str(e) or "SSL" in str(e):
+            if _is_ssl_error(e):
                 logger.warning(f"SSL certificate verification failed: {e}")
                 logger.info("Consider using a valid server URL or disabling SSL verification for development")
             else:
@@ -53,19 +127,29 @@ class LettaClient:
             return False
 
     def list_agents(self) -> List[dict]:
-        """List available agents"""
+        """List available agents (cached for AGENTS_CACHE_TTL seconds)"""
+        if self._agents_cache is not None and time.monotonic() - self._agents_cache_ts < AGENTS_CACHE_TTL:
+            return self._agents_cache
         try:
             agents = self.client.agents.list()
-            return [{"id": agent.id, "name": agent.name, "description": getattr(agent, 'description', '')} for agent in agents]
+            # AgentState always defines description (None when unset), so
+            # plain attribute access is enough
+            self._agents_cache = [{"id": agent.id, "name": agent.name, "description": agent.description} for agent in agents]
+            self._agents_cache_ts = time.monotonic()
+            return self._agents_cache
         except Exception as e:
             # Handle SSL certificate errors gracefully
-            if "CERTIFICATE_VERIFY_FAILED" in str(e) or "SSL" in str(e):
+            if _is_ssl_error(e):
                 logger.warning(f"SSL certificate verification failed while listing agents: {e}")
                 logger.info("Consider using a valid server URL or disabling SSL verification for development")
             else:
                 logger.error(f"Failed to list agents: {e}")
             return []
 
+    def invalidate_agents_cache(self) -> None:
+        """Make the next list_agents() call fetch from the server"""
+        self._agents_cache = None
+
     def set_agent(self, agent_id: str) -> bool:
         """Set the active agent"""
         self.current_agent_id = agent_id
@@ -85,14 +169,15 @@ class LettaClient:
             )
 
             # Handle direct .content
-            if hasattr(response, 'content') and response.content:
-                return response.content
+            response_content = getattr(response, 'content', None)
+            if response_content:
+                return response_content
 
             # Handle .messages[].content
-            if hasattr(response, 'messages'):
-                for message in response.messages:
-                    if hasattr(message, 'content') and message.content:
-                        return message.content
+            for message in getattr(response, 'messages', None) or ():
+                message_content = getattr(message, 'content', None)
+                if message_content:
+                    return message_content
             return None
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
@@ -104,6 +189,8 @@ class LettaClient:
             yield "Error: No agent selected"
             return
 
+        # Content waiting to be yielded as one batch
+        pending: List[str] = []
         try:
             message_data = [MessageCreate(role="user", content=content)]
             response_stream = self.client.agents.messages.create_stream(
@@ -112,51 +199,140 @@ class LettaClient:
                 stream_tokens=True  # Enable token-level streaming
             )
 
-            for chunk in response_stream:
-                # Handle reasoning messages if enabled
-                if show_reasoning and hasattr(chunk, 'message_type'):
-                    if chunk.message_type == 'reasoning_message':
-                        reasoning_content = getattr(chunk, 'reasoning', '')
-                        if reasoning_content:
-                            # Yield reasoning content with special marker for display layer
-                            yield f"__REASONING__:{reasoning_content}"
-                    elif chunk.message_type == 'hidden_reasoning_message':
-                        hidden_content = getattr(chunk, 'hidden_reasoning', '')
-                        if hidden_content:
-                            yield f"[Hidden Thinking] {hidden_content}"
-                
-                # Yield content when present, regardless of message_type
-                if hasattr(chunk, 'content') and chunk.content:
-                    # Process literal newlines in content - convert \n to actual newlines
-                    processed_content = chunk.content.replace('\\n', '\n')
-                    yield processed_content
+            loop = asyncio.get_running_loop()
+            chunks: asyncio.Queue = asyncio.Queue()
+            stop = threading.Event()
+            self._stream_executor.submit(self._pump_stream, response_stream, loop, chunks, stop)
+            pending_chars = 0
+            # The first content chunk is yielded straight away
+            last_flush_ns = 0
+            try:
+                async for chunk in self._drain(chunks):
+                    # Handle reasoning messages if enabled; the __REASONING__
+                    # marker tells the display layer to render it separately
+                    if show_reasoning:
+                        entry = _REASONING_MAP.get(getattr(chunk, 'message_type', None))
+                        if entry is not None:
+                            reasoning_content = getattr(chunk, entry[0], '')
+                            if reasoning_content:
+                                if pending:
+                                    yield "".join(pending)
+                                    pending.clear()
+                                    pending_chars = 0
+                                yield entry[1] + reasoning_content
+                    
+                    # Yield content when present, regardless of message_type
+                    chunk_content = getattr(chunk, 'content', None)
+                    if chunk_content:
+                        # Process literal newlines in content - convert \n to actual newlines
+                        if '\\n' in chunk_content:
+                            chunk_content = chunk_content.replace('\\n', '\n')
+                        pending.append(chunk_content)
+                        pending_chars += len(chunk_content)
+                        now_ns = time.monotonic_ns()
+                        if (not last_flush_ns or chunks.empty()
+                                or pending_chars >= STREAM_BATCH_CHARS
+                                or now_ns - last_flush_ns >= STREAM_BATCH_NS):
+                            yield "".join(pending)
+                            pending.clear()
+                            pending_chars = 0
+                            last_flush_ns = now_ns
+            finally:
+                # Tell the worker to stop if the consumer went away early
+                stop.set()
+
+            if pending:
+                yield "".join(pending)
 
         except Exception as e:
+            if pending:
+                yield "".join(pending)
             yield f"Error: {e}"
 
+    @staticmethod
+    def _pump_stream(response_stream, loop, chunks: asyncio.Queue, stop: threading.Event) -> None:
+        """Forward SDK chunks to the event loop's queue (runs on the stream worker)"""
+        try:
+            for chunk in response_stream:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        except Exception as e:
+            loop.call_soon_threadsafe(chunks.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(chunks.put_nowait, _STREAM_END)
+
+    @staticmethod
+    async def _drain(chunks: asyncio.Queue):
+        """Yield queued chunks until the end marker, re-raising stream errors"""
+        while True:
+            chunk = await chunks.get()
+            if chunk is _STREAM_END:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
 # Global client instance - lazy initialization
 _letta_client = None
+_letta_client_lock = threading.Lock()
+
+# Public LettaClient methods the lazy wrapper stubs out when unavailable
+_CALLABLE_NAMES = frozenset(
+    name for name, value in vars(LettaClient).items()
+    if callable(value) and not name.startswith('_')
+)
+# Stubs for these return an empty list instead of None
+_LIST_METHODS = frozenset({'list_agents'})
+# Method name -> stub, built once and reused
+_unavailable_methods = {}
+
+def _make_unavailable(name):
+    """Get the stub that stands in for a LettaClient method while unavailable"""
+    method = _unavailable_methods.get(name)
+    if method is None:
+        empty_list = name in _LIST_METHODS
+        def method(*args, **kwargs):
+            logger.error("Letta client is not available - check configuration")
+            return [] if empty_list else None
+        _unavailable_methods[name] = method
+    return method
 
 class LazyLettaClient:
     """Lazy initialization wrapper for LettaClient"""
     
     def __init__(self):
         self._client = None
+        # Outcome of config validation: None until checked, then True/False
+        self._available: Optional[bool] = None
     
     def _ensure_client(self):
         """Ensure client is initialized"""
+        if self._client is not None:
+            return self._client
+        if self._available is False:
+            # Validation already failed - don't re-check on every access
+            return None
         global _letta_client
-        if _letta_client is None:
-            try:
-                if config.validate():
-                    _letta_client = LettaClient()
-                else:
+        # Callers may reach the client from worker threads concurrently
+        with _letta_client_lock:
+            if _letta_client is None:
+                try:
+                    self._available = bool(config.validate())
+                    if self._available:
+                        _letta_client = LettaClient()
+                        atexit.register(_letta_client.close)
+                except Exception as e:
+                    self._available = False
                     _letta_client = None
-            except Exception as e:
-                _letta_client = None
         self._client = _letta_client
         return self._client
     
+    def close(self):
+        """Close the underlying client, if one was ever created"""
+        if self._client is not None:
+            self._client.close()
+
     def __getattr__(self, name):
         """Delegate attribute access to the actual client"""
         client = self._ensure_client()
@@ -165,11 +341,12 @@ class LazyLettaClient:
             if name in ['current_agent_id', 'client']:
                 return None
             # For method calls, return a function that handles the unavailable state
-            if callable(getattr(LettaClient, name, None)):
-                def unavailable_method(*args, **kwargs):
-                    logger.error("Letta client is not available - check configuration")
-                    return [] if name == 'list_agents' else None
-                return unavailable_method
+            if name in _CALLABLE_NAMES:
+                return _make_unavailable(name)
+            # Introspection (hasattr, mock.patch, asyncio) probes private
+            # names and expects AttributeError for anything that isn't there
+            if name.startswith('_'):
+                raise AttributeError(name)
             raise RuntimeError("Letta client is not available - check configuration")
         return getattr(client, name)
 
@@ -20,17 +20,30 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import argparse
-import asyncio
 import sys
-from pathlib import Path
 
-# Add the current directory to Python path
-sys.path.insert(0, str(Path(__file__).parent))
 
-from simple_chat import main
-from tui_app import run as run_tui
+def _run_async(coro) -> None:
+    """Run a coroutine to completion, on uvloop when it is installed."""
+    import asyncio
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
 
-if __name__ == "__main__":
+    if hasattr(asyncio, "Runner"):
+        # Python 3.11+: the runner owns the loop's whole lifecycle
+        loop_factory = uvloop.new_event_loop if uvloop else None
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(coro)
+    else:
+        if uvloop:
+            uvloop.install()
+        asyncio.run(coro)
+
+
+def main() -> None:
+    """Parse arguments and launch the TUI or the text interface."""
     parser = argparse.ArgumentParser(description='Letta Chat Client')
     parser.add_argument('--verbose', '-v', action='store_true', 
                        help='Enable verbose logging output')
@@ -43,12 +56,16 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
+    # Each interface is imported in its own branch so startup only loads
+    # the one being launched
     try:
         if args.text:
             # Use original text interface when requested
-            asyncio.run(main(verbose=args.verbose, debug=args.debug, reasoning=args.reasoning))
+            from simple_chat import main as run_text
+            _run_async(run_text(verbose=args.verbose, debug=args.debug, reasoning=args.reasoning))
         else:
             # Use enhanced TUI by default - pass reasoning flag
+            from tui_app import run as run_tui
             run_tui(reasoning=args.reasoning)
     except KeyboardInterrupt:
         print("\nGoodbye!")
@@ -56,3 +73,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,13 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
+import codecs
 import logging
+import os
 import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
 from letta_api import letta_client
 from config import config
 
@@ -39,7 +44,8 @@ def setup_logging(verbose=False, debug=False):
         level=level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler('letta_chat.log'),
+            # delay: the log file is only opened once something is logged
+            logging.FileHandler('letta_chat.log', delay=True),
             logging.StreamHandler(sys.stdout) if verbose or debug else logging.NullHandler()
         ]
     )
@@ -56,110 +62,246 @@ show_reasoning = False
 # Expose letta_client at module level for test patching and dependency injection
 letta_client = letta_client
 
+# How long a fetched agent listing is trusted before asking the server again
+AGENT_NAME_TTL = 30.0
+
+# When stdout is not a terminal, streamed replies are written in blocks of
+# roughly this many characters instead of chunk by chunk
+STREAM_WRITE_CHARS = 8192
+
+# Most requests _bounded_gather keeps in flight against the server at once
+BATCH_CONCURRENCY = 8
+
+# Agents from the last listing keyed by id, and when that listing was fetched
+_agents_by_id: Dict[str, dict] = {}
+_agents_fetched_at: Optional[float] = None
+
+def _remember_agents(agents):
+    """Index a freshly fetched agent list by id for name lookups"""
+    global _agents_fetched_at
+    _agents_by_id.clear()
+    invalid = []
+    for agent in agents:
+        # Validate agent structure once here; lookups then use the entries as-is
+        if isinstance(agent, dict) and 'id' in agent and 'name' in agent:
+            _agents_by_id[agent['id']] = agent
+        else:
+            invalid.append(agent)
+    if invalid:
+        logger.warning(f"Ignoring {len(invalid)} invalid agent entries: {invalid}")
+    _agents_fetched_at = time.monotonic()
+
+async def _run_blocking(func, *args):
+    """Run a synchronous letta_client call on the default executor"""
+    # The client does blocking HTTP; a worker thread keeps the event loop
+    # free for input and for other requests in flight
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+def _agents_stale():
+    """Whether the cached agent listing is missing or older than AGENT_NAME_TTL"""
+    return _agents_fetched_at is None or time.monotonic() - _agents_fetched_at >= AGENT_NAME_TTL
+
+def _refresh_agents(agents):
+    """Cache a listing returned by letta_client.list_agents(), if it is usable"""
+    if agents and isinstance(agents, list):
+        _remember_agents(agents)
+
+async def _aresolve_agent_name(agent_id, default="Unknown Agent"):
+    """Get an agent's name, listing agents (off the event loop) only when the cached listing is stale"""
+    if _agents_stale():
+        _refresh_agents(await _run_blocking(letta_client.list_agents))
+    agent = _agents_by_id.get(agent_id)
+    return agent['name'] if agent is not None else default
+
+def _forget_agents():
+    """Drop the cached agent listing"""
+    global _agents_fetched_at
+    _agents_by_id.clear()
+    _agents_fetched_at = None
+
+# Whether stdout is a terminal; checked once instead of an isatty() system
+# call on every streamed chunk. sys.stdout is None under pythonw or a
+# detached service
+_IS_TTY = sys.stdout is not None and sys.stdout.isatty()
+
+# stdout's encoding doesn't change after startup, so work out once whether
+# text has to be narrowed to it before printing
+_OUT_ENCODING = getattr(sys.stdout, 'encoding', None) or 'utf-8'
+try:
+    _OUT_IS_UTF8 = codecs.lookup(_OUT_ENCODING).name == 'utf-8'
+except LookupError:
+    _OUT_ENCODING, _OUT_IS_UTF8 = 'ascii', False
+
 def safe_print(text, end="", flush=False):
     """Print text with emoji support"""
+    # Piped output keeps Python's block buffering; only complete lines are
+    # pushed out early so a reader like tee still sees progress
+    if flush and not _IS_TTY:
+        flush = "\n" in text or "\n" in end
+    if not _OUT_IS_UTF8:
+        # Swap characters the console can't show for '?' up front
+        text = text.encode(_OUT_ENCODING, errors='replace').decode(_OUT_ENCODING)
     try:
         print(text, end=end, flush=flush)
-    except (UnicodeEncodeError, UnicodeDecodeError):
-        # Fallback for problematic characters
+    except UnicodeEncodeError:
+        # Even UTF-8 rejects lone surrogates
+        print(text.encode('utf-8', errors='replace').decode('utf-8'), end=end, flush=flush)
+
+def _resolve_input(future, result, error):
+    """Complete an _ainput future on the event loop thread"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+async def _ainput(prompt=""):
+    """Read a line of input without blocking the event loop
+
+    On a terminal the read runs on a daemon thread rather than the
+    default executor: a prompt still waiting when the user hits Ctrl+C
+    would otherwise keep executor shutdown, and so the process, waiting
+    for Enter. Piped input does use the executor, since a daemon thread
+    blocked on buffered stdin can abort interpreter shutdown.
+    EOFError and KeyboardInterrupt are re-raised to the caller.
+    """
+    if not sys.stdin.isatty():
+        return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def read():
         try:
-            safe_text = text.encode('utf-8', errors='replace').decode('utf-8')
-            print(safe_text, end=end, flush=flush)
-        except Exception:
-            # Last resort - replace problematic characters
-            safe_text = text.encode('ascii', errors='replace').decode('ascii')
-            print(safe_text, end=end, flush=flush)
+            result, error = input(prompt), None
+        except BaseException as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(_resolve_input, future, result, error)
+        except RuntimeError:
+            # The loop already shut down while we were waiting for input
+            pass
+
+    threading.Thread(target=read, name="chat-input", daemon=True).start()
+    return await future
+
+# Windows consoles only interpret ANSI escapes once VT processing is on
+_ansi_enabled = False
+
+def _enable_ansi():
+    """Make sure the console understands ANSI escapes (once per process)"""
+    global _ansi_enabled
+    if not _ansi_enabled:
+        _ansi_enabled = True
+        if os.name == 'nt':
+            # Running an empty command turns on VT processing for this console
+            os.system('')
 
 def clear_screen():
     """Clear the terminal screen - works on Windows, Unix/Linux, and Mac"""
-    import os
-    import sys
-    
+    _enable_ansi()
     try:
-        if os.name == 'nt':  # Windows
-            os.system('cls')
-        else:  # Unix/Linux/Mac
-            os.system('clear')
+        # Escape sequences instead of spawning cls/clear on every call
+        sys.stdout.write('\033[2J\033[H')
+        sys.stdout.flush()
     except Exception:
-        # Fallback - use ANSI escape sequence for terminals that support it
-        try:
-            print('\033[2J\033[H', end='', flush=True)
-        except Exception:
-            # Last resort - print enough newlines to clear most screens
-            print('\n' * 50)
+        # Last resort - print enough newlines to clear most screens
+        print('\n' * 50)
+
+# Fixed screens, built once and written with a single call
+_BANNER = (
+    "=" * 60 + "\n"
+    "           LETTA SIMPLE CHAT CLIENT\n"
+    + "=" * 60 + "\n"
+    "\n"
+)
+
+_HELP_TEXT = """
+Commands:
+  /help     - Show this help
+  /status   - Show connection status
+  /agents   - List available agents
+  /agent <id> - Set agent by ID or number
+  /clear    - Clear screen
+  /reasoning - Toggle reasoning/thinking display
+  /quit     - Exit the application
+
+Note: Use /agent 5 to select agent #5 from the list
+Note: Use --reasoning flag to enable reasoning by default
+
+"""
 
 def print_banner():
     """Print a simple banner"""
-    print("=" * 60)
-    print("           LETTA SIMPLE CHAT CLIENT")
-    print("=" * 60)
-    print()
+    sys.stdout.write(_BANNER)
 
-def print_status():
+async def print_status():
     """Print current status"""
-    print(f"Server: {config.letta_server_url}")
-    print(f"User: {config.display_name}")
+    lines = [
+        f"Server: {config.letta_server_url}",
+        f"User: {config.display_name}",
+    ]
 
     if letta_client and letta_client.current_agent_id:
         # Get agent name from the list with proper error handling
         try:
             # Check if client is available before calling methods
             if hasattr(letta_client, 'client') and letta_client.client is None:
-                print(f"Agent: Unknown Agent ({letta_client.current_agent_id}) - Client not available")
+                lines.append(f"Agent: Unknown Agent ({letta_client.current_agent_id}) - Client not available")
             else:
-                # Try to get agents list with basic error handling
-                agents = letta_client.list_agents()
-                agent_name = "Unknown Agent"
-                
-                # Validate agents list and structure
-                if agents and isinstance(agents, list):
-                    for agent in agents:
-                        # Validate agent structure
-                        if isinstance(agent, dict) and 'id' in agent and 'name' in agent:
-                            if agent['id'] == letta_client.current_agent_id:
-                                agent_name = agent['name']
-                                break
-                        else:
-                            logger.warning(f"Invalid agent structure: {agent}")
-                            continue
-                
-                print(f"Agent: {agent_name} ({letta_client.current_agent_id})")
+                agent_name = await _aresolve_agent_name(letta_client.current_agent_id)
+                lines.append(f"Agent: {agent_name} ({letta_client.current_agent_id})")
             
         except Exception as e:
             logger.error(f"Error retrieving agent info: {e}")
-            print(f"Agent: Unknown Agent ({letta_client.current_agent_id})")
+            lines.append(f"Agent: Unknown Agent ({letta_client.current_agent_id})")
     else:
-        print("Agent: None selected")
+        lines.append("Agent: None selected")
+
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
 
 def print_help():
     """Print help commands"""
-    print("\nCommands:")
-    print("  /help     - Show this help")
-    print("  /status   - Show connection status")
-    print("  /agents   - List available agents")
-    print("  /agent <id> - Set agent by ID or number")
-    print("  /clear    - Clear screen")
-    print("  /reasoning - Toggle reasoning/thinking display")
-    print("  /quit     - Exit the application")
-    print("\nNote: Use /agent 5 to select agent #5 from the list")
-    print("Note: Use --reasoning flag to enable reasoning by default")
-    print()
+    sys.stdout.write(_HELP_TEXT)
+
+async def _bounded_gather(coros, limit=BATCH_CONCURRENCY):
+    """Await coroutines concurrently, at most `limit` at a time; results keep their order"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros))
 
 async def test_connection():
     """Test connection to Letta server"""
     print("Testing connection to Letta server...")
-    if letta_client.test_connection():
+    connected = await _run_blocking(letta_client.test_connection)
+    if connected:
         print("Connected successfully!")
         return True
     else:
         print("- Connection failed!")
         return False
 
+async def _fetch_agents():
+    """Fetch the agent list from the server without blocking the event loop"""
+    # An explicit listing always asks the server
+    letta_client.invalidate_agents_cache()
+    return await _run_blocking(letta_client.list_agents)
+
 async def list_agents():
     """List available agents"""
     print("Fetching available agents...")
-    agents = letta_client.list_agents()
+    _print_agents(await _fetch_agents())
+
+def _print_agents(agents):
+    """Print a fetched agent list and remember it for name lookups"""
     if agents:
+        _remember_agents(agents)
         print(f"Found {len(agents)} agents:")
         for i, agent in enumerate(agents, 1):
             print(f"  {i}. {agent['name']} (ID: {agent['id']})")
@@ -172,26 +314,32 @@ async def list_agents():
 async def set_agent(agent_id: str):
     """Set the active agent by ID or number"""
     # Check if it's a number (from the list)
-    if agent_id.isdigit():
-        agents = letta_client.list_agents()
-        try:
-            agent_index = int(agent_id) - 1  # Convert to 0-based index
-            if 0 <= agent_index < len(agents):
-                actual_agent_id = agents[agent_index]['id']
-                if letta_client.set_agent(actual_agent_id):
-                    print(f"Set agent: {agents[agent_index]['name']} (ID: {actual_agent_id})")
-                else:
-                    print(f"Failed to set agent: {agent_id}")
-            else:
-                print(f"Invalid agent number: {agent_id}. Use /agents to see available agents.")
-        except (ValueError, IndexError):
-            print(f"Invalid agent number: {agent_id}. Use /agents to see available agents.")
-    else:
+    try:
+        agent_index = int(agent_id) - 1  # Convert to 0-based index
+    except ValueError:
         # Try as direct agent ID
         if letta_client.set_agent(agent_id):
+            if agent_id not in _agents_by_id:
+                # Likely an agent created since the last listing - list
+                # again on the next name lookup instead of showing it as
+                # unknown until the cache expires
+                _forget_agents()
+                letta_client.invalidate_agents_cache()
             print(f"Set agent: {agent_id}")
         else:
             print(f"Failed to set agent: {agent_id}")
+    else:
+        agents = await _run_blocking(letta_client.list_agents)
+        if 0 <= agent_index < len(agents):
+            agent = agents[agent_index]
+            if letta_client.set_agent(agent['id']):
+                # Reuse this listing for later name lookups
+                _remember_agents(agents)
+                print(f"Set agent: {agent['name']} (ID: {agent['id']})")
+            else:
+                print(f"Failed to set agent: {agent_id}")
+        else:
+            print(f"Invalid agent number: {agent_id}. Use /agents to see available agents.")
     print()
 
 async def send_message(message: str):
@@ -203,13 +351,7 @@ async def send_message(message: str):
     agent_name = "Assistant"  # Default fallback
     if letta_client and letta_client.current_agent_id:
         try:
-            agents = letta_client.list_agents()
-            if agents and isinstance(agents, list):
-                for agent in agents:
-                    if isinstance(agent, dict) and 'id' in agent and 'name' in agent:
-                        if agent['id'] == letta_client.current_agent_id:
-                            agent_name = agent['name']
-                            break
+            agent_name = await _aresolve_agent_name(letta_client.current_agent_id, default=agent_name)
         except Exception:
             # If we can't get the agent name, fall back to "Assistant"
             pass
@@ -218,8 +360,13 @@ async def send_message(message: str):
 
     try:
         # Use streaming for real-time response
-        response = ""
         reasoning_buffer = ""
+        # Content not yet written to stdout. A terminal gets every chunk as
+        # soon as it arrives (the stream already coalesces bursts); piped
+        # output is written in larger blocks or at line ends
+        out_buffer = []
+        out_chars = 0
+        flush_chars = 1 if _IS_TTY else STREAM_WRITE_CHARS
         
         async for chunk in letta_client.send_message_stream(message, show_reasoning=show_reasoning):
             if chunk.startswith("__REASONING__:"):
@@ -230,17 +377,26 @@ async def send_message(message: str):
                 # This is regular content
                 # If we have buffered reasoning, display it first
                 if reasoning_buffer:
+                    if out_buffer:
+                        safe_print("".join(out_buffer), end="", flush=True)
+                        out_buffer.clear()
+                        out_chars = 0
                     print(f"[Thinking] {reasoning_buffer}")
-                    response += f"[Thinking] {reasoning_buffer}"
                     reasoning_buffer = ""
                 
-                safe_print(chunk, end="", flush=True)
-                response += chunk
+                out_buffer.append(chunk)
+                out_chars += len(chunk)
+                if out_chars >= flush_chars or "\n" in chunk:
+                    safe_print("".join(out_buffer), end="", flush=True)
+                    out_buffer.clear()
+                    out_chars = 0
         
+        if out_buffer:
+            safe_print("".join(out_buffer), end="", flush=True)
+
         # Handle any remaining reasoning buffer
         if reasoning_buffer:
             print(f"[Thinking] {reasoning_buffer}")
-            response += f"[Thinking] {reasoning_buffer}"
 
         print()  # New line after response
 
@@ -263,57 +419,87 @@ async def main(verbose=False, debug=False, reasoning=False):
         print("Configuration validation failed. Please check your .env file.")
         return
 
-    # Test connection
-    if not await test_connection():
+    try:
+        await _run_session()
+    finally:
+        # Release the pooled connections now rather than at interpreter exit
+        letta_client.close()
+
+# Returned by a command handler to end the chat loop
+_QUIT = object()
+
+async def _cmd_agent(arg):
+    """Handle /agent <id>"""
+    if arg:
+        await set_agent(arg)
+    else:
+        print("Usage: /agent <agent_id>")
+
+def _toggle_reasoning(arg):
+    """Handle /reasoning"""
+    global show_reasoning
+    show_reasoning = not show_reasoning
+    print(f"Reasoning display: {'ON' if show_reasoning else 'OFF'}")
+
+def _quit(arg):
+    """Handle /quit"""
+    print("Goodbye!")
+    return _QUIT
+
+# Slash command -> handler taking the rest of the line; handlers may be
+# coroutines
+COMMANDS: Dict[str, Callable[[str], object]] = {
+    'help': lambda arg: print_help(),
+    'status': lambda arg: print_status(),
+    'agents': lambda arg: list_agents(),
+    'agent': _cmd_agent,
+    'clear': lambda arg: clear_screen(),
+    'reasoning': _toggle_reasoning,
+    'quit': _quit,
+}
+
+async def _run_session():
+    """Connect, pick an agent and run the chat loop until the user quits"""
+    # Test the connection and fetch agents concurrently - they are
+    # independent round-trips to the same server
+    connected, agents = await _bounded_gather([test_connection(), _fetch_agents()])
+    if not connected:
         print("Cannot connect to server. Exiting.")
         return
 
     # List agents
-    await list_agents()
+    _print_agents(agents)
 
     # Set agent if configured
     if config.default_agent_id:
         await set_agent(config.default_agent_id)
 
-    print_status()
+    await print_status()
     print_help()
 
     # Main chat loop
     while True:
         try:
-            user_input = input(f"\n[{config.display_name}] ").strip()
+            user_input = (await _ainput(f"\n[{config.display_name}] ")).strip()
 
             if not user_input:
                 continue
 
             # Handle commands
             if user_input.startswith('/'):
-                parts = user_input[1:].split(' ', 1)
-                command = parts[0].lower()
-                arg = parts[1] if len(parts) > 1 else ""
+                command, _, arg = user_input[1:].partition(' ')
+                command = command.lower()
 
-                if command == 'help':
-                    print_help()
-                elif command == 'status':
-                    print_status()
-                elif command == 'agents':
-                    await list_agents()
-                elif command == 'agent':
-                    if arg:
-                        await set_agent(arg)
-                    else:
-                        print("Usage: /agent <agent_id>")
-                elif command == 'clear':
-                    clear_screen()
-                elif command == 'reasoning':
-                    show_reasoning = not show_reasoning
-                    print(f"Reasoning display: {'ON' if show_reasoning else 'OFF'}")
-                elif command == 'quit':
-                    print("Goodbye!")
-                    break
-                else:
+                handler = COMMANDS.get(command)
+                if handler is None:
                     print(f"Unknown command: {command}")
                     print_help()
+                    continue
+                result = handler(arg)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                if result is _QUIT:
+                    break
             else:
                 # Send message
                 await send_message(user_input)
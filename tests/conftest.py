@@ -2,29 +2,41 @@
 Shared test fixtures and configuration
 """
 import pytest
-import tempfile
 import os
+import sys
+import tempfile
 from pathlib import Path
-from unittest.mock import Mock, AsyncMock, patch
+from types import SimpleNamespace
+from unittest.mock import Mock
 from letta_client import Letta as LettaClient
 
-@pytest.fixture
-def temp_env_file():
-    """Create a temporary .env file for testing"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.env', delete=False) as tmp:
-        tmp.write("""# Test environment
+# Contents temp_env_file starts every test with
+TEST_ENV_FILE = """# Test environment
 LETTA_SERVER_URL=https://test-server.com:8283
 LETTA_API_TOKEN=test_token_123
 DISPLAY_NAME=TestUser
 DEFAULT_AGENT_ID=agent_123
-""")
-        tmp.flush()
-        yield tmp.name
-    # Cleanup
-    try:
-        os.unlink(tmp.name)
-    except (PermissionError, OSError):
-        pass
+"""
+
+@pytest.fixture(scope="session")
+def env_dir(tmp_path_factory):
+    """Directory holding the shared test .env file, created once per session"""
+    return tmp_path_factory.mktemp("env")
+
+@pytest.fixture
+def temp_env_file(env_dir):
+    """Create a temporary .env file for testing"""
+    env_path = env_dir / ".env"
+    # Rewritten for each test, so nothing carries over from the last one
+    env_path.write_text(TEST_ENV_FILE)
+    return str(env_path)
+
+@pytest.fixture
+def fast_tmpdir():
+    """Temporary directory, on RAM-backed /dev/shm where available"""
+    base = "/dev/shm" if sys.platform.startswith("linux") and os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=base) as temp_dir:
+        yield Path(temp_dir)
 
 @pytest.fixture
 def mock_letta_client():
@@ -62,18 +74,41 @@ def mock_letta_client():
 
     return client
 
-@pytest.fixture
-def mock_env_vars(monkeypatch):
-    """Mock environment variables"""
-    monkeypatch.setenv("LETTA_SERVER_URL", "https://test-server.com:8283")
-    monkeypatch.setenv("LETTA_API_TOKEN", "test_token_123")
-    monkeypatch.setenv("DISPLAY_NAME", "TestUser")
-    monkeypatch.setenv("DEFAULT_AGENT_ID", "agent_123")
+# Environment used by mock_env_vars
+TEST_ENV_VARS = {
+    "LETTA_SERVER_URL": "https://test-server.com:8283",
+    "LETTA_API_TOKEN": "test_token_123",
+    "DISPLAY_NAME": "TestUser",
+    "DEFAULT_AGENT_ID": "agent_123",
+}
+
+@pytest.fixture(scope="session", autouse=True)
+def mock_env_vars():
+    """Mock environment variables (set once for every test in the session)"""
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in TEST_ENV_VARS.items():
+            mp.setenv(name, value)
+        yield
 
 @pytest.fixture
+def clean_env(monkeypatch):
+    """Remove the client's settings from the environment for one test"""
+    for name in TEST_ENV_VARS:
+        # setenv first so the original state is restored afterwards even
+        # when the variable was unset and Config() sets it from a .env file
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)
+    return monkeypatch
+
+@pytest.fixture(scope="session")
 def sample_agents():
-    """Sample agent data for testing"""
+    """Sample agent data for testing (shared, so treat it as read-only)"""
     return [
         {"id": "agent_123", "name": "Test Agent 1", "description": "First test agent"},
         {"id": "agent_456", "name": "Test Agent 2", "description": "Second test agent"},
     ]
+
+@pytest.fixture(scope="session")
+def mock_agent_objects(sample_agents):
+    """sample_agents as the attribute-style objects the SDK returns"""
+    return [SimpleNamespace(**agent) for agent in sample_agents]
@@ -2,24 +2,29 @@
 Unit tests for config.py
 """
 import pytest
-import tempfile
 import os
+import re
 from pathlib import Path
-from unittest.mock import patch, mock_open
-from config import Config
+from types import SimpleNamespace
+from unittest.mock import patch, mock_open, Mock
+from config import Config, get_user_input, get_available_agents, interactive_setup
+# Aliased so pytest doesn't collect it as a test
+from config import test_letta_connection as check_letta_connection
+
+# A whole LETTA_SERVER_URL=https://test.com line, so longer values don't count
+SERVER_URL_LINE_RE = re.compile(r"^LETTA_SERVER_URL=https://test\.com$", re.MULTILINE)
 
 class TestConfig:
-    def test_initialization_defaults(self):
+    def test_initialization_defaults(self, clean_env):
         """Test config initialization with defaults"""
-        with patch.dict(os.environ, {}, clear=True), \
-             patch('config.load_dotenv'):
-            config = Config()
-            assert config.letta_server_url == "https://your-letta-server.com:8283"
-            assert config.letta_api_token == ""
-            assert config.display_name == "User"
-            assert config.default_agent_id == ""
+        clean_env.setattr('config._load_dotenv_cached', lambda env_path=None: {})
+        config = Config()
+        assert config.letta_server_url == "https://your-letta-server.com:8283"
+        assert config.letta_api_token == ""
+        assert config.display_name == "User"
+        assert config.default_agent_id == ""
 
-    def test_initialization_from_env(self, mock_env_vars):
+    def test_initialization_from_env(self):
         """Test config initialization from environment variables"""
         config = Config()
         assert config.letta_server_url == "https://test-server.com:8283"
@@ -27,33 +32,45 @@ class TestConfig:
         assert config.display_name == "TestUser"
         assert config.default_agent_id == "agent_123"
 
-    def test_validate_success(self, mock_env_vars):
+    def test_validate_success(self):
         """Test successful validation"""
         config = Config()
         assert config.validate() is True
 
-    def test_validate_missing_token(self):
-        """Test validation with missing API token"""
-        with patch.dict(os.environ, {"LETTA_SERVER_URL": "https://test.com"}, clear=True), \
-             patch('config.load_dotenv'):
-            config = Config()
-            assert config.validate() is False
+    def test_validate_checks_once(self):
+        """Test repeated validate() calls reuse the first check"""
+        config = Config()
+        with patch.object(Config, '_check_required', return_value=True) as mock_check:
+            assert config.validate() is True
+            assert config.validate() is True
+            mock_check.assert_called_once()
 
-    def test_validate_missing_server_url(self):
-        """Test validation with missing server URL"""
-        with patch.dict(os.environ, {"LETTA_API_TOKEN": "token"}, clear=True), \
-             patch('config.load_dotenv'):
-            config = Config()
-            assert config.validate() is False
+    def test_validate_rechecks_after_change(self, clean_env):
+        """Test that a cached validation result follows attribute changes"""
+        clean_env.setenv("LETTA_API_TOKEN", "token")
+        clean_env.setattr('config._load_dotenv_cached', lambda env_path=None: {})
+        config = Config()
+        assert config.validate() is False
+        config.letta_server_url = "https://test.com"
+        assert config.validate() is True
 
-    def test_validate_default_server_url(self):
-        """Test validation with default server URL"""
-        with patch.dict(os.environ, {"LETTA_API_TOKEN": "token"}, clear=True), \
-             patch('config.load_dotenv'):
-            config = Config()
-            assert config.validate() is False
+    @pytest.mark.parametrize("env", [
+        pytest.param({"LETTA_SERVER_URL": "https://test.com"}, id="missing_token"),
+        pytest.param({"LETTA_API_TOKEN": "token"}, id="missing_server_url"),
+        pytest.param(
+            {"LETTA_API_TOKEN": "token", "LETTA_SERVER_URL": "https://your-letta-server.com:8283"},
+            id="default_server_url",
+        ),
+    ])
+    def test_validate_incomplete(self, clean_env, env):
+        """Test validation fails without a token or a real server URL"""
+        for name, value in env.items():
+            clean_env.setenv(name, value)
+        clean_env.setattr('config._load_dotenv_cached', lambda env_path=None: {})
+        config = Config()
+        assert config.validate() is False
 
-    def test_get_letta_client_config(self, mock_env_vars):
+    def test_get_letta_client_config(self):
         """Test getting Letta client configuration"""
         config = Config()
         client_config = config.get_letta_client_config()
@@ -64,72 +81,143 @@ class TestConfig:
         }
         assert client_config == expected
 
-    def test_save_to_env_new_file(self):
+    def test_letta_client_config_cached_until_changed(self):
+        """Test the client config is reused until a setting it uses changes"""
+        config = Config()
+        client_config = config.get_letta_client_config()
+        assert config.get_letta_client_config() is client_config
+
+        config.display_name = "Someone"
+        assert config.get_letta_client_config() is client_config
+
+        config.letta_api_token = "new_token"
+        assert config.get_letta_client_config() == {
+            "base_url": "https://test-server.com:8283",
+            "token": "new_token"
+        }
+
+    def test_save_to_env_new_file(self, fast_tmpdir):
         """Test saving to new .env file"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            env_path = Path(temp_dir) / ".env"
-
-            with patch('config.Path', return_value=env_path):
-                config = Config()
-                config.save_to_env(
-                    LETTA_SERVER_URL="https://new-server.com",
-                    LETTA_API_TOKEN="new_token"
-                )
-
-                assert env_path.exists()
-                content = env_path.read_text()
-                assert "LETTA_SERVER_URL=https://new-server.com" in content
-                assert "LETTA_API_TOKEN=new_token" in content
-                assert "# Letta Chat Client Configuration" in content
-
-    def test_save_to_env_existing_file(self):
+        env_path = fast_tmpdir / ".env"
+
+        with patch('config.Path', return_value=env_path):
+            config = Config()
+            config.save_to_env(
+                LETTA_SERVER_URL="https://new-server.com",
+                LETTA_API_TOKEN="new_token"
+            )
+
+            assert env_path.exists()
+            content = env_path.read_text()
+            assert "LETTA_SERVER_URL=https://new-server.com" in content
+            assert "LETTA_API_TOKEN=new_token" in content
+            assert "# Letta Chat Client Configuration" in content
+            assert not (fast_tmpdir / ".env.tmp").exists()
+
+    def test_save_to_env_existing_file(self, fast_tmpdir):
         """Test saving to existing .env file (idempotent)"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            env_path = Path(temp_dir) / ".env"
+        env_path = fast_tmpdir / ".env"
 
-            # Create existing .env file
-            env_path.write_text("""# Existing config
+        # Create existing .env file
+        env_path.write_text("""# Existing config
 LETTA_SERVER_URL=https://old-server.com
 DISPLAY_NAME=OldUser
 """)
 
-            with patch('config.Path', return_value=env_path):
-                config = Config()
-                config.save_to_env(
-                    LETTA_SERVER_URL="https://new-server.com",
-                    LETTA_API_TOKEN="new_token"
-                )
+        with patch('config.Path', return_value=env_path):
+            config = Config()
+            config.save_to_env(
+                LETTA_SERVER_URL="https://new-server.com",
+                LETTA_API_TOKEN="new_token"
+            )
 
-                content = env_path.read_text()
-                assert "LETTA_SERVER_URL=https://new-server.com" in content
-                assert "LETTA_API_TOKEN=new_token" in content
-                assert "DISPLAY_NAME=OldUser" in content  # Should preserve existing
+            content = env_path.read_text()
+            assert "LETTA_SERVER_URL=https://new-server.com" in content
+            assert "LETTA_API_TOKEN=new_token" in content
+            assert "DISPLAY_NAME=OldUser" in content  # Should preserve existing
 
-    def test_save_to_env_idempotent(self):
+    def test_save_to_env_idempotent(self, fast_tmpdir):
         """Test that save_to_env is idempotent"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            env_path = Path(temp_dir) / ".env"
+        env_path = fast_tmpdir / ".env"
 
-            with patch('config.Path', return_value=env_path):
-                config = Config()
+        with patch('config.Path', return_value=env_path):
+            config = Config()
 
-                # Save first time
-                config.save_to_env(LETTA_SERVER_URL="https://test.com")
+            # Save first time
+            config.save_to_env(LETTA_SERVER_URL="https://test.com")
+
+            # Save second time with same data
+            config.save_to_env(LETTA_SERVER_URL="https://test.com")
+
+            # Should not duplicate
+            content = env_path.read_text()
+            assert len(SERVER_URL_LINE_RE.findall(content)) == 1
+
+    def test_save_to_env_reuses_parsed_file(self, fast_tmpdir):
+        """Test repeated saves don't re-read a .env file that hasn't changed"""
+        env_path = fast_tmpdir / ".env"
+        env_path.write_text("DISPLAY_NAME=OldUser\n")
+
+        with patch('config.Path', return_value=env_path), \
+             patch.object(Path, 'read_text', autospec=True, side_effect=Path.read_text) as mock_read:
+            config = Config()
+            config.save_to_env(LETTA_SERVER_URL="https://test.com")
+            config.save_to_env(LETTA_SERVER_URL="https://test.com")
+            config.save_to_env(DISPLAY_NAME="OldUser")
+            assert mock_read.call_count == 1
+
+            # An edit made outside save_to_env is picked up
+            with open(env_path, "a") as f:
+                f.write("DEFAULT_AGENT_ID=agent_123\n")
+            config.save_to_env(DEFAULT_AGENT_ID="agent_123")
+            assert mock_read.call_count == 2
 
-                # Save second time with same data
+        content = env_path.read_text()
+        assert "DISPLAY_NAME=OldUser" in content
+        assert len(SERVER_URL_LINE_RE.findall(content)) == 1
+
+    def test_save_to_env_cache_follows_working_directory(self, fast_tmpdir, monkeypatch):
+        """Test a cached .env isn't reused for another directory's .env"""
+        first, second = fast_tmpdir / "first", fast_tmpdir / "second"
+        for directory, name in ((first, "AliceUser"), (second, "BobbyUser")):
+            directory.mkdir()
+            (directory / ".env").write_text(f"DISPLAY_NAME={name}\n")
+        # Same size and mtime, so only the path tells the files apart
+        stat = os.stat(first / ".env")
+        os.utime(second / ".env", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        config = Config()
+        monkeypatch.chdir(first)
+        config.save_to_env(DISPLAY_NAME="AliceUser")
+        monkeypatch.chdir(second)
+        config.save_to_env(DISPLAY_NAME="AliceUser")
+
+        assert "DISPLAY_NAME=AliceUser" in (second / ".env").read_text()
+
+    def test_save_to_env_unchanged_skips_write(self, fast_tmpdir):
+        """Test saving values that are already in .env leaves the file untouched"""
+        env_path = fast_tmpdir / ".env"
+
+        with patch('config.Path', return_value=env_path):
+            config = Config()
+            config.save_to_env(LETTA_SERVER_URL="https://test.com", DISPLAY_NAME="User")
+
+            # A loosened mode is tightened again even though nothing is written
+            os.chmod(env_path, 0o644)
+            with patch('config.os.replace') as mock_replace:
                 config.save_to_env(LETTA_SERVER_URL="https://test.com")
+                mock_replace.assert_not_called()
+                if os.name == 'posix':
+                    assert env_path.stat().st_mode & 0o777 == 0o600
 
-                # Should not duplicate
-                content = env_path.read_text()
-                assert content.count("LETTA_SERVER_URL=https://test.com") == 1
+                config.save_to_env(DISPLAY_NAME="Other")
+                mock_replace.assert_called_once()
 
 class TestConfigInteractiveFunctions:
     """Test interactive configuration functions"""
     
     def test_get_user_input_with_default(self):
         """Test get_user_input with default value"""
-        from config import get_user_input
-        from unittest.mock import patch
         
         with patch('builtins.input', return_value=''):
             result = get_user_input("Enter value", default="default_value")
@@ -137,8 +225,6 @@ class TestConfigInteractiveFunctions:
     
     def test_get_user_input_with_user_input(self):
         """Test get_user_input with user input"""
-        from config import get_user_input
-        from unittest.mock import patch
         
         with patch('builtins.input', return_value='user_value'):
             result = get_user_input("Enter value", default="default_value")
@@ -146,8 +232,6 @@ class TestConfigInteractiveFunctions:
     
     def test_get_user_input_required_empty(self):
         """Test get_user_input with required field and empty input"""
-        from config import get_user_input
-        from unittest.mock import patch
         
         with patch('builtins.input', side_effect=['', 'valid_value']):
             result = get_user_input("Enter value", required=True)
@@ -155,8 +239,6 @@ class TestConfigInteractiveFunctions:
     
     def test_get_user_input_not_required(self):
         """Test get_user_input with not required field"""
-        from config import get_user_input
-        from unittest.mock import patch
         
         with patch('builtins.input', return_value=''):
             result = get_user_input("Enter value", required=False)
@@ -164,48 +246,35 @@ class TestConfigInteractiveFunctions:
     
     def test_test_letta_connection_success(self):
         """Test successful Letta connection"""
-        from config import test_letta_connection
-        from unittest.mock import patch, Mock
         
         mock_client = Mock()
         mock_client.health.check.return_value = None
         
         with patch('letta_client.Letta', return_value=mock_client):
-            success, message = test_letta_connection("https://test.com", "token")
+            success, message = check_letta_connection("https://test.com", "token")
             assert success is True
             assert message == "Connection successful"
     
     def test_test_letta_connection_failure(self):
         """Test failed Letta connection"""
-        from config import test_letta_connection
-        from unittest.mock import patch, Mock
         
         mock_client = Mock()
         mock_client.health.check.side_effect = Exception("Connection failed")
         
         with patch('letta_client.Letta', return_value=mock_client):
-            success, message = test_letta_connection("https://test.com", "token")
+            success, message = check_letta_connection("https://test.com", "token")
             assert success is False
             assert message == "Connection failed"
     
     def test_get_available_agents_success(self):
         """Test getting available agents successfully"""
-        from config import get_available_agents
-        from unittest.mock import patch, Mock
         
         mock_client = Mock()
-        mock_agent1 = Mock()
-        mock_agent1.id = "agent1"
-        mock_agent1.name = "Agent 1"
-        mock_agent1.description = "Test agent 1"
-        
-        mock_agent2 = Mock()
-        mock_agent2.id = "agent2"
-        mock_agent2.name = "Agent 2"
-        # No description attribute - use getattr to return empty string
-        mock_agent2.description = ""
-        
-        mock_client.agents.list.return_value = [mock_agent1, mock_agent2]
+        mock_client.agents.list.return_value = [
+            SimpleNamespace(id="agent1", name="Agent 1", description="Test agent 1"),
+            # No description attribute - get_available_agents falls back to ""
+            SimpleNamespace(id="agent2", name="Agent 2"),
+        ]
         
         with patch('letta_client.Letta', return_value=mock_client):
             agents = get_available_agents("https://test.com", "token")
@@ -215,8 +284,6 @@ class TestConfigInteractiveFunctions:
     
     def test_get_available_agents_failure(self):
         """Test getting available agents with error"""
-        from config import get_available_agents
-        from unittest.mock import patch, Mock
         
         mock_client = Mock()
         mock_client.agents.list.side_effect = Exception("API Error")
@@ -227,29 +294,29 @@ class TestConfigInteractiveFunctions:
     
     def test_interactive_setup_cancelled(self):
         """Test interactive setup when user cancels"""
-        from config import interactive_setup
-        from unittest.mock import patch
         
-        with patch('config.get_user_input', side_effect=['https://test.com', 'token']), \
-             patch('config.test_letta_connection', return_value=(False, "Connection failed")), \
-             patch('builtins.input', return_value='n'):  # User chooses not to retry
+        with patch.multiple(
+            'config',
+            get_user_input=Mock(side_effect=['https://test.com', 'token']),
+            test_letta_connection=Mock(return_value=(False, "Connection failed")),
+        ), patch('builtins.input', return_value='n'):  # User chooses not to retry
             
             result = interactive_setup()
             assert result is False
     
     def test_interactive_setup_success(self):
         """Test successful interactive setup"""
-        from config import interactive_setup
-        from unittest.mock import patch
         
-        with patch('config.get_user_input', side_effect=[
-            'https://test.com',  # server URL
-            'token',            # API token
-            'TestUser'          # display name
-        ]), \
-        patch('config.test_letta_connection', return_value=(True, "Success")), \
-        patch('config.get_available_agents', return_value=[]), \
-        patch('config.Config.save_to_env'):
+        with patch.multiple(
+            'config',
+            get_user_input=Mock(side_effect=[
+                'https://test.com',  # server URL
+                'token',            # API token
+                'TestUser'          # display name
+            ]),
+            test_letta_connection=Mock(return_value=(True, "Success")),
+            get_available_agents=Mock(return_value=[]),
+        ), patch('config.Config.save_to_env'):
             
             result = interactive_setup()
             assert result is True
@@ -4,90 +4,107 @@ Integration tests for the complete application flow
 import pytest
 import asyncio
 import os
-from unittest.mock import patch, Mock, AsyncMock
+import re
+from types import SimpleNamespace
+from unittest.mock import patch, Mock
 from pathlib import Path
-from config import Config
+from dotenv import dotenv_values
+import letta_api
+import simple_chat
+from config import Config, _DOTENV_CACHE
 from letta_api import LettaClient
 
+# A whole LETTA_SERVER_URL=https://test.com line, so longer values don't count
+SERVER_URL_LINE_RE = re.compile(r"^LETTA_SERVER_URL=https://test\.com$", re.MULTILINE)
+
+class _ChunkStream:
+    """Async iterator over a precomputed list, standing in for send_message_stream"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+@pytest.fixture
+def patched_letta(monkeypatch):
+    """Point letta_api at a stub config and a mock SDK; returns the SDK"""
+    fake_sdk = Mock()
+    monkeypatch.setattr(letta_api, 'LettaSDK', lambda *args, **kwargs: fake_sdk)
+    monkeypatch.setattr(letta_api, 'config', SimpleNamespace(
+        default_agent_id="agent_123",
+        letta_server_url="https://test.com",
+        letta_api_token="test_token",
+    ))
+    return fake_sdk
+
+@pytest.fixture
+def simple_chat_ctx(monkeypatch, mock_letta_client):
+    """Point simple_chat at a valid stub config and the mock client; returns the client"""
+    monkeypatch.setattr(simple_chat, 'config', SimpleNamespace(
+        validate=lambda: True,
+        display_name="TestUser",
+        default_agent_id="agent_123",
+    ))
+    monkeypatch.setattr(simple_chat, 'letta_client', mock_letta_client)
+    return mock_letta_client
+
 class TestIntegration:
-    def test_config_and_client_integration(self, mock_env_vars):
+    def test_config_and_client_integration(self, patched_letta):
         """Test that config and client work together"""
-        with patch('letta_api.LettaSDK') as mock_sdk_class, \
-             patch('letta_api.config') as mock_config:
-            mock_sdk = Mock()
-            mock_sdk_class.return_value = mock_sdk
-            
-            # Setup mock config
-            mock_config.default_agent_id = "agent_123"
-            mock_config.letta_server_url = "https://test.com"
-            mock_config.letta_api_token = "test_token"
-            
-            client = LettaClient()
-            assert client.current_agent_id == mock_config.default_agent_id
-
-    def test_full_workflow_simulation(self, mock_env_vars, mock_letta_client):
+        client = LettaClient()
+        assert client.current_agent_id == letta_api.config.default_agent_id
+
+    def test_full_workflow_simulation(self, simple_chat_ctx):
         """Test complete workflow simulation"""
-        with patch('simple_chat.config') as mock_config, \
-             patch('simple_chat.letta_client', mock_letta_client):
-
-            # Setup mocks
-            mock_config.validate.return_value = True
-            mock_config.display_name = "TestUser"
-            mock_config.default_agent_id = "agent_123"
-            
-            # Setup mock client return values
-            mock_letta_client.test_connection.return_value = True
-            mock_letta_client.list_agents.return_value = [{"id": "agent_123", "name": "Test Agent"}]
-            mock_letta_client.set_agent.return_value = True
-            mock_letta_client.send_message.return_value = "Test response from agent"
-
-            # Test connection
-            assert mock_letta_client.test_connection() is True
-
-            # Test agent listing
-            agents = mock_letta_client.list_agents()
-            assert len(agents) == 1
-
-            # Test agent setting
-            assert mock_letta_client.set_agent("agent_123") is True
-
-            # Test message sending
-            response = mock_letta_client.send_message("Hello")
-            assert response == "Test response from agent"
-
-    @pytest.mark.asyncio
-    async def test_streaming_workflow(self, mock_env_vars, mock_letta_client):
+        mock_letta_client = simple_chat_ctx
+
+        # Setup mock client return values
+        mock_letta_client.test_connection.return_value = True
+        mock_letta_client.list_agents.return_value = [{"id": "agent_123", "name": "Test Agent"}]
+        mock_letta_client.set_agent.return_value = True
+        mock_letta_client.send_message.return_value = "Test response from agent"
+
+        # Test connection
+        assert mock_letta_client.test_connection() is True
+
+        # Test agent listing
+        agents = mock_letta_client.list_agents()
+        assert len(agents) == 1
+
+        # Test agent setting
+        assert mock_letta_client.set_agent("agent_123") is True
+
+        # Test message sending
+        response = mock_letta_client.send_message("Hello")
+        assert response == "Test response from agent"
+
+    async def test_streaming_workflow(self, simple_chat_ctx):
         """Test streaming message workflow"""
-        with patch('simple_chat.config') as mock_config, \
-             patch('simple_chat.letta_client', mock_letta_client):
-
-            mock_config.validate.return_value = True
-            mock_config.display_name = "TestUser"
-            mock_config.default_agent_id = "agent_123"
-            
-            # Setup async mock for streaming
-            async def mock_stream():
-                yield "Streaming response chunk"
-            
-            mock_letta_client.send_message_stream.return_value = mock_stream()
-
-            # Test streaming
-            chunks = []
-            async for chunk in mock_letta_client.send_message_stream("Hello"):
-                chunks.append(chunk)
-
-            assert len(chunks) == 1
-            assert chunks[0] == "Streaming response chunk"
-
-    def test_error_handling_chain(self, mock_env_vars):
+        mock_letta_client = simple_chat_ctx
+
+        mock_letta_client.send_message_stream.return_value = _ChunkStream(["Streaming response chunk"])
+
+        # Test streaming
+        chunks = []
+        async for chunk in mock_letta_client.send_message_stream("Hello"):
+            chunks.append(chunk)
+
+        assert len(chunks) == 1
+        assert chunks[0] == "Streaming response chunk"
+
+    def test_error_handling_chain(self, patched_letta):
         """Test error handling across components"""
-        with patch('letta_api.LettaSDK') as mock_sdk_class:
-            mock_sdk = Mock()
-            mock_sdk.health.check.side_effect = Exception("Health check failed")
-            mock_sdk_class.return_value = mock_sdk
+        patched_letta.health.check.side_effect = Exception("Health check failed")
 
-            client = LettaClient()
-            assert client.test_connection() is False
+        client = LettaClient()
+        assert client.test_connection() is False
 
     def test_config_idempotency(self, temp_env_file):
         """Test that config operations are idempotent"""
@@ -102,51 +119,60 @@ class TestIntegration:
             # Should not create duplicates
             with open(temp_env_file, 'r') as f:
                 content = f.read()
-                assert content.count("LETTA_SERVER_URL=https://test.com") == 1
+                assert len(SERVER_URL_LINE_RE.findall(content)) == 1
 
-    def test_environment_loading(self, temp_env_file):
+    def test_environment_loading(self, temp_env_file, clean_env):
         """Test environment loading from file"""
-        with patch('config.load_dotenv') as mock_load_dotenv:
-            config = Config()
-            mock_load_dotenv.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_concurrent_operations(self, mock_env_vars, mock_letta_client):
+        clean_env.setenv("DISPLAY_NAME", "FromEnvironment")
+        # Count real parses of the file
+        parses = [0]
+
+        def counting_parse(env_path):
+            parses[0] += 1
+            return dotenv_values(env_path)
+
+        clean_env.setattr('config.dotenv_values', counting_parse)
+
+        config = Config(temp_env_file)
+        assert config.letta_server_url == "https://test-server.com:8283"
+        assert config.default_agent_id == "agent_123"
+        # Variables already in the environment take precedence
+        assert config.display_name == "FromEnvironment"
+        assert parses[0] == 1
+
+        # Later instances reuse the parsed file while it is unchanged
+        Config(temp_env_file)
+        assert parses[0] == 1
+
+        # Editing the file makes the next instance parse it again
+        stat = os.stat(temp_env_file)
+        cached_files = len(_DOTENV_CACHE)
+        os.utime(temp_env_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        Config(temp_env_file)
+        assert parses[0] == 2
+        # The new parse replaces the old one instead of piling up beside it
+        assert len(_DOTENV_CACHE) == cached_files
+
+    async def test_concurrent_operations(self, simple_chat_ctx):
         """Test concurrent operations (simulated)"""
-        with patch('simple_chat.config') as mock_config, \
-             patch('simple_chat.letta_client', mock_letta_client):
-
-            mock_config.validate.return_value = True
-            mock_config.display_name = "TestUser"
-            mock_config.default_agent_id = "agent_123"
-            
-            # Setup async mock for streaming
-            async def mock_stream_generator():
-                yield "Response for message"
-            
-            # Create a fresh generator for each call
-            mock_letta_client.send_message_stream.side_effect = lambda msg: mock_stream_generator()
-
-            # Simulate multiple operations
-            tasks = []
-            for i in range(5):
-                task = asyncio.create_task(
-                    self._collect_stream_chunks(mock_letta_client.send_message_stream(f"Message {i}"))
-                )
-                tasks.append(task)
-
-            # Wait for all tasks
-            results = await asyncio.gather(*tasks)
-
-            # All should complete successfully
-            assert len(results) == 5
-            for result in results:
-                assert len(result) == 1
-                assert "Response for message" in result[0]
+        mock_letta_client = simple_chat_ctx
+
+        # A fresh stream for each call
+        chunks = ["Response for message"]
+        mock_letta_client.send_message_stream.side_effect = lambda msg: _ChunkStream(chunks)
+
+        # Simulate multiple operations; gather schedules the coroutines itself
+        results = await asyncio.gather(*(
+            self._collect_stream_chunks(mock_letta_client.send_message_stream(f"Message {i}"))
+            for i in range(5)
+        ))
+
+        # All should complete successfully
+        assert len(results) == 5
+        for result in results:
+            assert len(result) == 1
+            assert "Response for message" in result[0]
     
     async def _collect_stream_chunks(self, stream):
         """Helper to collect chunks from async stream"""
-        chunks = []
-        async for chunk in stream:
-            chunks.append(chunk)
-        return chunks
+        return [chunk async for chunk in stream]
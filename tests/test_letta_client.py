@@ -2,31 +2,78 @@
 Unit tests for letta_client.py
 """
 import pytest
-from unittest.mock import patch, Mock, AsyncMock
-from letta_api import LettaClient
+from types import SimpleNamespace
+from unittest.mock import patch, Mock
+import letta_api
+from letta_api import LettaClient, LazyLettaClient
 from letta_client import MessageCreate
 
+# The messages argument every send of "Hello" is expected to make
+EXPECTED_MESSAGES = [MessageCreate(role="user", content="Hello")]
+
+@pytest.fixture(scope="class")
+def sdk_class():
+    """Patch letta_api's config and SDK once for every test in the class"""
+    with patch('letta_api.config') as mock_config, \
+         patch('letta_api.LettaSDK') as mock_sdk_class:
+        mock_config.default_agent_id = "agent_123"
+        mock_config.letta_server_url = "https://test-server.com:8283"
+        mock_config.letta_api_token = "test_token_123"
+        yield mock_sdk_class
+
 class TestLettaClient:
     @pytest.fixture
-    def client(self, mock_env_vars):
+    def client(self, sdk_class):
         """Create LettaClient instance for testing"""
-        with patch('letta_api.config') as mock_config, \
-             patch('letta_api.LettaSDK') as mock_sdk_class:
-            mock_config.default_agent_id = "agent_123"
-            mock_config.letta_server_url = "https://test-server.com:8283"
-            mock_config.letta_api_token = "test_token_123"
-            
-            # Create a mock SDK instance
-            mock_sdk = Mock()
-            mock_sdk_class.return_value = mock_sdk
-            
-            return LettaClient()
-
-    def test_initialization(self, client, mock_env_vars):
+        # A fresh mock SDK instance per test, so no call history or canned
+        # responses leak between tests
+        sdk_class.return_value = Mock()
+        client = LettaClient()
+        yield client
+        client.close()
+
+    def test_initialization(self, client):
         """Test client initialization"""
         assert client.current_agent_id == "agent_123"
         assert client.client is not None
 
+    def test_close_releases_http_session(self, client):
+        """Test close shuts down the pooled HTTP session"""
+        assert client._http is None
+        client.client.health.check()
+        assert not client._http.is_closed
+        client.close()
+        assert client._http.is_closed
+
+    def test_client_built_once_across_threads(self, client):
+        """Test threads racing on first use share one SDK client and HTTP session"""
+        import threading
+        import time
+        barrier = threading.Barrier(2)
+        built = []
+
+        def slow_sdk(**kwargs):
+            # Hold the first build long enough for the other thread to wait on it
+            time.sleep(0.05)
+            built.append(Mock())
+            return built[-1]
+
+        results = []
+
+        def first_use():
+            barrier.wait()
+            results.append(client.client)
+
+        with patch('letta_api.LettaSDK', side_effect=slow_sdk) as mock_sdk_class:
+            threads = [threading.Thread(target=first_use) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        mock_sdk_class.assert_called_once()
+        assert results[0] is results[1] is built[0]
+
     def test_test_connection_success(self, client):
         """Test successful connection"""
         client.client.health.check.return_value = Mock(version="0.1.324", status="ok")
@@ -39,18 +86,9 @@ class TestLettaClient:
         assert client.test_connection() is False
         client.client.health.check.assert_called_once()
 
-    def test_list_agents_success(self, client, sample_agents):
+    def test_list_agents_success(self, client, mock_agent_objects):
         """Test successful agent listing"""
-        # Setup mock agents
-        mock_agents = []
-        for agent_data in sample_agents:
-            mock_agent = Mock()
-            mock_agent.id = agent_data["id"]
-            mock_agent.name = agent_data["name"]
-            mock_agent.description = agent_data["description"]
-            mock_agents.append(mock_agent)
-
-        client.client.agents.list.return_value = mock_agents
+        client.client.agents.list.return_value = mock_agent_objects
         agents = client.list_agents()
 
         assert len(agents) == 2
@@ -65,6 +103,26 @@ class TestLettaClient:
         agents = client.list_agents()
         assert agents == []
 
+    def test_list_agents_cached(self, client):
+        """Test agent listing is reused until the cache is invalidated"""
+        mock_agent = SimpleNamespace(id="agent_123", name="Test Agent", description="")
+        client.client.agents.list.return_value = [mock_agent]
+
+        first = client.list_agents()
+        assert client.list_agents() == first
+        client.client.agents.list.assert_called_once()
+
+        client.invalidate_agents_cache()
+        client.list_agents()
+        assert client.client.agents.list.call_count == 2
+
+    def test_list_agents_failure_not_cached(self, client):
+        """Test a failed listing is retried on the next call"""
+        client.client.agents.list.side_effect = [Exception("API Error"), []]
+        assert client.list_agents() == []
+        assert client.list_agents() == []
+        assert client.client.agents.list.call_count == 2
+
     def test_set_agent(self, client):
         """Test setting agent"""
         result = client.set_agent("agent_456")
@@ -74,9 +132,7 @@ class TestLettaClient:
     def test_send_message_success_direct_content(self, client):
         """Test successful message sending with direct response.content"""
         client.current_agent_id = "agent_123"
-        mock_response = Mock()
-        mock_response.content = "Direct response"
-        mock_response.messages = []  # Empty messages array
+        mock_response = SimpleNamespace(content="Direct response", messages=[])
         client.client.agents.messages.create.return_value = mock_response
 
         response = client.send_message("Hello")
@@ -84,18 +140,16 @@ class TestLettaClient:
         assert response == "Direct response"
         client.client.agents.messages.create.assert_called_once_with(
             agent_id="agent_123",
-            messages=[MessageCreate(role="user", content="Hello")]
+            messages=EXPECTED_MESSAGES
         )
 
     def test_send_message_success(self, client):
         """Test successful message sending"""
         client.current_agent_id = "agent_123"
-        mock_response = Mock()
-        mock_message = Mock()
-        mock_message.content = "Test response"
-        mock_response.messages = [mock_message]
-        # Ensure response.content is None so it falls back to messages
-        mock_response.content = None
+        # response.content is None, so it falls back to messages
+        mock_response = SimpleNamespace(
+            content=None, messages=[SimpleNamespace(content="Test response")]
+        )
         client.client.agents.messages.create.return_value = mock_response
 
         response = client.send_message("Hello")
@@ -103,7 +157,7 @@ class TestLettaClient:
         assert response == "Test response"
         client.client.agents.messages.create.assert_called_once_with(
             agent_id="agent_123",
-            messages=[MessageCreate(role="user", content="Hello")]
+            messages=EXPECTED_MESSAGES
         )
 
     def test_send_message_no_agent(self, client):
@@ -121,18 +175,14 @@ class TestLettaClient:
         response = client.send_message("Hello")
         assert response is None
 
-    def test_send_message_stream_content_only(self, client):
+    async def test_send_message_stream_content_only(self, client):
         """Test streaming with content-only chunks (no message_type dependency)"""
         client.current_agent_id = "agent_123"
 
         # Mock streaming response with chunks that have content but no message_type
-        mock_chunk1 = Mock()
-        mock_chunk1.content = "Hello "
-        # No message_type attribute - this should still work with our fix
-        
-        mock_chunk2 = Mock()
-        mock_chunk2.content = "world!"
         # No message_type attribute - this should still work with our fix
+        mock_chunk1 = SimpleNamespace(content="Hello ")
+        mock_chunk2 = SimpleNamespace(content="world!")
 
         client.client.agents.messages.create_stream.return_value = [mock_chunk1, mock_chunk2]
 
@@ -143,31 +193,23 @@ class TestLettaClient:
         client.client.agents.messages.create_stream.assert_not_called()
         
         # The method should be called when we iterate
-        import asyncio
-        async def test_stream():
-            chunks = []
-            async for chunk in client.send_message_stream("Hello"):
-                chunks.append(chunk)
-            return chunks
-        
-        chunks = asyncio.run(test_stream())
+        chunks = []
+        async for chunk in client.send_message_stream("Hello"):
+            chunks.append(chunk)
         assert chunks == ["Hello ", "world!"]
         client.client.agents.messages.create_stream.assert_called_once_with(
             agent_id="agent_123",
-            messages=[MessageCreate(role="user", content="Hello")],
+            messages=EXPECTED_MESSAGES,
             stream_tokens=True
         )
 
-    @pytest.mark.asyncio
     async def test_send_message_stream_success(self, client):
         """Test successful message streaming"""
         client.current_agent_id = "agent_123"
 
         # Mock streaming response
-        mock_chunk1 = Mock()
-        mock_chunk1.content = "Hello "
-        mock_chunk2 = Mock()
-        mock_chunk2.content = "world!"
+        mock_chunk1 = SimpleNamespace(content="Hello ", message_type=None)
+        mock_chunk2 = SimpleNamespace(content="world!", message_type=None)
 
         client.client.agents.messages.create_stream.return_value = [mock_chunk1, mock_chunk2]
 
@@ -178,11 +220,10 @@ class TestLettaClient:
         assert chunks == ["Hello ", "world!"]
         client.client.agents.messages.create_stream.assert_called_once_with(
             agent_id="agent_123",
-            messages=[MessageCreate(role="user", content="Hello")],
+            messages=EXPECTED_MESSAGES,
             stream_tokens=True
         )
 
-    @pytest.mark.asyncio
     async def test_send_message_stream_no_agent(self, client):
         """Test streaming with no agent selected"""
         client.current_agent_id = None
@@ -194,7 +235,6 @@ class TestLettaClient:
         assert chunks == ["Error: No agent selected"]
         client.client.agents.messages.create_stream.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_send_message_stream_failure(self, client):
         """Test streaming failure"""
         client.current_agent_id = "agent_123"
@@ -207,6 +247,44 @@ class TestLettaClient:
         assert len(chunks) == 1
         assert "Error: Stream Error" in chunks[0]
 
+    async def test_send_message_stream_batches_small_chunks(self, client):
+        """Test queued token chunks are coalesced without losing text"""
+        from letta_api import STREAM_BATCH_CHARS
+        client.current_agent_id = "agent_123"
+        client.client.agents.messages.create_stream.return_value = [
+            SimpleNamespace(content=ch) for ch in "x" * 100
+        ]
+
+        # Pump on this thread, so every chunk is queued before the first is
+        # drained, and keep the time limit out of the way
+        with patch.object(client._stream_executor, 'submit', side_effect=lambda fn, *args: fn(*args)), \
+             patch('letta_api.STREAM_BATCH_NS', 10**12):
+            chunks = []
+            async for chunk in client.send_message_stream("Hello"):
+                chunks.append(chunk)
+
+        assert chunks[0] == "x"
+        assert "".join(chunks) == "x" * 100
+        assert len(chunks) < 100
+        assert "x" * STREAM_BATCH_CHARS in chunks
+        assert all(len(chunk) <= STREAM_BATCH_CHARS for chunk in chunks)
+
+    async def test_send_message_stream_failure_mid_stream(self, client):
+        """Test an error raised while iterating keeps the chunks before it"""
+        client.current_agent_id = "agent_123"
+
+        def broken_stream():
+            yield SimpleNamespace(content="partial")
+            raise Exception("Connection reset")
+
+        client.client.agents.messages.create_stream.return_value = broken_stream()
+
+        chunks = []
+        async for chunk in client.send_message_stream("Hello"):
+            chunks.append(chunk)
+
+        assert chunks == ["partial", "Error: Connection reset"]
+
     def test_test_connection_ssl_error(self, client):
         """Test connection with SSL certificate error"""
         client.client.health.check.side_effect = Exception("CERTIFICATE_VERIFY_FAILED: certificate verify failed")
@@ -221,6 +299,19 @@ class TestLettaClient:
         result = client.list_agents()
         assert result == []
 
+    def test_is_ssl_error(self):
+        """Test SSL detection by type, by wrapped cause and by message"""
+        import ssl
+        from letta_api import _is_ssl_error
+
+        wrapped = Exception("Connection failed")
+        wrapped.__cause__ = ssl.SSLError(1, "handshake failure")
+
+        assert _is_ssl_error(ssl.SSLError(1, "handshake failure"))
+        assert _is_ssl_error(wrapped)
+        assert _is_ssl_error(Exception("CERTIFICATE_VERIFY_FAILED"))
+        assert not _is_ssl_error(Exception("Connection refused"))
+
     def test_send_message_exception(self, client):
         """Test send_message with exception"""
         client.current_agent_id = "agent_123"
@@ -229,21 +320,17 @@ class TestLettaClient:
         response = client.send_message("Hello")
         assert response is None
 
-    @pytest.mark.asyncio
     async def test_send_message_stream_reasoning(self, client):
         """Test streaming with reasoning messages"""
         client.current_agent_id = "agent_123"
 
         # Mock reasoning chunk
-        mock_reasoning_chunk = Mock()
-        mock_reasoning_chunk.message_type = "reasoning_message"
-        mock_reasoning_chunk.reasoning = "I need to think about this"
-        mock_reasoning_chunk.content = None
+        mock_reasoning_chunk = SimpleNamespace(
+            message_type="reasoning_message", reasoning="I need to think about this", content=None
+        )
 
         # Mock content chunk
-        mock_content_chunk = Mock()
-        mock_content_chunk.content = "Here's my response"
-        mock_content_chunk.message_type = None
+        mock_content_chunk = SimpleNamespace(content="Here's my response", message_type=None)
 
         client.client.agents.messages.create_stream.return_value = [mock_reasoning_chunk, mock_content_chunk]
 
@@ -254,16 +341,14 @@ class TestLettaClient:
         assert "__REASONING__:I need to think about this" in chunks
         assert "Here's my response" in chunks
 
-    @pytest.mark.asyncio
     async def test_send_message_stream_hidden_reasoning(self, client):
         """Test streaming with hidden reasoning messages"""
         client.current_agent_id = "agent_123"
 
         # Mock hidden reasoning chunk
-        mock_hidden_chunk = Mock()
-        mock_hidden_chunk.message_type = "hidden_reasoning_message"
-        mock_hidden_chunk.hidden_reasoning = "Secret thoughts"
-        mock_hidden_chunk.content = None
+        mock_hidden_chunk = SimpleNamespace(
+            message_type="hidden_reasoning_message", hidden_reasoning="Secret thoughts", content=None
+        )
 
         client.client.agents.messages.create_stream.return_value = [mock_hidden_chunk]
 
@@ -275,32 +360,49 @@ class TestLettaClient:
 
 class TestLazyLettaClient:
     """Test LazyLettaClient functionality"""
-    
-    def test_lazy_client_unavailable(self):
+
+    @pytest.fixture
+    def unavailable_lazy_client(self, monkeypatch):
+        """LazyLettaClient whose config fails validation"""
+        monkeypatch.setattr(letta_api, '_letta_client', None)
+        monkeypatch.setattr(letta_api.config, 'validate', lambda: False)
+        return LazyLettaClient()
+
+    def test_lazy_client_unavailable(self, unavailable_lazy_client):
         """Test LazyLettaClient when client is unavailable"""
-        from letta_api import LazyLettaClient
-        from unittest.mock import patch
-        
-        # Mock config validation to fail
-        with patch('letta_api.config.validate', return_value=False):
+        lazy_client = unavailable_lazy_client
+
+        # Test that methods return appropriate defaults when unavailable
+        assert lazy_client.test_connection() is None
+        assert lazy_client.list_agents() == []
+        assert lazy_client.set_agent("test") is None
+        assert lazy_client.send_message("test") is None
+
+    def test_lazy_client_validates_once_when_unavailable(self):
+        """Test a failed validation is remembered instead of re-run"""
+        with patch('letta_api._letta_client', None), \
+             patch('letta_api.config.validate', return_value=False) as mock_validate:
             lazy_client = LazyLettaClient()
-            
-            # Test that methods return appropriate defaults when unavailable
-            assert lazy_client.test_connection() is None
-            assert lazy_client.list_agents() == []
-            assert lazy_client.set_agent("test") is None
-            assert lazy_client.send_message("test") is None
-    
-    @pytest.mark.asyncio
-    async def test_lazy_client_stream_unavailable(self):
+            lazy_client.list_agents()
+            lazy_client.list_agents()
+            assert lazy_client.current_agent_id is None
+            mock_validate.assert_called_once()
+
+    def test_lazy_client_close_without_client(self):
+        """Test closing the wrapper before any client exists is a no-op"""
+        with patch('letta_api.config.validate') as mock_validate:
+            LazyLettaClient().close()
+            mock_validate.assert_not_called()
+
+    def test_lazy_client_unavailable_stubs_reused(self, unavailable_lazy_client):
+        """Test unavailable stubs are shared and private probes fail cleanly"""
+        lazy_client = unavailable_lazy_client
+        assert lazy_client.list_agents is lazy_client.list_agents
+        assert not hasattr(lazy_client, '__func__')
+        assert not hasattr(lazy_client, '_is_coroutine')
+
+    async def test_lazy_client_stream_unavailable(self, unavailable_lazy_client):
         """Test LazyLettaClient streaming when unavailable"""
-        from letta_api import LazyLettaClient
-        from unittest.mock import patch
-        
-        # Mock config validation to fail
-        with patch('letta_api.config.validate', return_value=False):
-            lazy_client = LazyLettaClient()
-            
-            # When client is unavailable, send_message_stream returns None
-            stream = lazy_client.send_message_stream("test")
-            assert stream is None
+        # When client is unavailable, send_message_stream returns None
+        stream = unavailable_lazy_client.send_message_stream("test")
+        assert stream is None
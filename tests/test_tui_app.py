@@ -0,0 +1,143 @@
+"""
+Unit tests for tui_app.py
+"""
+import pytest
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from tui_app import AnimaTUIApp, ChatTranscript, _batched
+
+def _recording_transcript():
+    """ChatTranscript that records the Text it displays instead of needing a running App"""
+    transcript = ChatTranscript("TestUser")
+    transcript.updates = []
+    transcript._content_widget = SimpleNamespace(update=transcript.updates.append)
+    return transcript
+
+class _StubStream:
+    """Async iterator over precomputed chunks, then an error or an endless wait"""
+
+    def __init__(self, chunks, error=None, hang=False):
+        self._chunks = iter(chunks)
+        self._error = error
+        self._hang = hang
+        self.cancelled = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        for chunk in self._chunks:
+            return chunk
+        if self._error is not None:
+            raise self._error
+        if self._hang:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        raise StopAsyncIteration
+
+@pytest.fixture
+def transcript(monkeypatch):
+    """Recording transcript with scrolling and the refresh timer stubbed out"""
+    transcript = _recording_transcript()
+    monkeypatch.setattr(transcript, 'scroll_end', lambda *args, **kwargs: None)
+    monkeypatch.setattr(transcript, 'set_timer', lambda *args, **kwargs: Mock())
+    return transcript
+
+class TestChatTranscript:
+    def test_incremental_render_matches_full_render_after_eviction(self, transcript):
+        """Test the prefix/tail render stays identical to a full re-render once turns are dropped"""
+        total = ChatTranscript.MAX_TURNS + 5
+        for i in range(total):
+            role = "user" if i % 2 == 0 else "agent"
+            transcript.append(role, f"Message {i}", agent_name="Test Agent")
+
+        transcript.extend_last(" and")
+        transcript.extend_last(" more")
+        transcript.flush()
+
+        turns = list(transcript._turns)
+        assert len(turns) == ChatTranscript.MAX_TURNS
+        assert turns[0].content == "Message 5"
+        assert turns[-1].content == f"Message {total - 1} and more"
+
+        fresh = _recording_transcript()
+        fresh._turns.extend(turns)
+        fresh._render_turns(restyle=True)
+
+        assert transcript.updates[-1] == fresh.updates[-1]
+
+@pytest.fixture
+def app(transcript):
+    """AnimaTUIApp that isn't running, with its transcript swapped for the recording one"""
+    app = AnimaTUIApp()
+    app.query_one = lambda *args, **kwargs: transcript
+    return app
+
+class TestAnimaTUIApp:
+    async def test_streamed_reply_splits_around_reasoning(self, app, transcript):
+        """Test reasoning mid-reply starts a new agent turn and trailing reasoning comes last"""
+        app._agents = {"agent_123": "Test Agent"}
+        stream = _StubStream(["Hello", "__REASONING__:Thinking it over", " world", "__REASONING__:Done"])
+        event = SimpleNamespace(value="Hi", input=SimpleNamespace(value="Hi"))
+        with patch('tui_app.letta_client') as mock_client:
+            mock_client.current_agent_id = "agent_123"
+            mock_client.send_message_stream.return_value = stream
+
+            await app.on_input_submitted(event)
+
+        assert event.input.value == ""
+        assert [(turn.role, turn.content, turn.agent_name) for turn in transcript._turns] == [
+            ("user", "Hi", None),
+            ("agent", "Hello", "Test Agent"),
+            ("reasoning", "[Thinking] Thinking it over", None),
+            ("agent", " world", "Test Agent"),
+            ("reasoning", "[Thinking] Done", None),
+        ]
+
+    async def test_handle_command_dispatch(self, app, transcript):
+        """Test /agent, /reasoning and unknown commands reach the right handling"""
+        with patch('tui_app.letta_client') as mock_client:
+            mock_client.set_agent.return_value = True
+
+            await app._handle_command("agent")
+            await app._handle_command("AGENT agent_456")
+            await app._handle_command("reasoning")
+            await app._handle_command("bogus now")
+
+            mock_client.set_agent.assert_called_once_with("agent_456")
+        assert app._show_reasoning is True
+        assert [turn.content for turn in transcript._turns] == [
+            "Usage: /agent <id or number>",
+            "Set agent: agent_456",
+            "Reasoning display enabled",
+            "Unknown command: /bogus. Type /help for available commands.",
+        ]
+
+class TestBatched:
+    async def test_groups_queued_chunks(self):
+        """Test chunks that arrive before the consumer runs come out as one list"""
+        batches = [batch async for batch in _batched(_StubStream(["a", "b", "c"]))]
+        assert batches == [["a", "b", "c"]]
+
+    async def test_error_after_received_chunks(self):
+        """Test a stream error is raised only after the chunks before it"""
+        batches = []
+        with pytest.raises(RuntimeError, match="Connection reset"):
+            async for batch in _batched(_StubStream(["a", "b"], error=RuntimeError("Connection reset"))):
+                batches.append(batch)
+        assert batches == [["a", "b"]]
+
+    async def test_consumer_stopping_cancels_producer(self):
+        """Test the producer task is cancelled when the consumer stops early"""
+        stream = _StubStream(["a"], hang=True)
+        batches = _batched(stream)
+        assert await batches.__anext__() == ["a"]
+
+        await batches.aclose()
+        # Let the cancellation reach the producer task
+        await asyncio.sleep(0)
+        assert stream.cancelled
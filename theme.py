@@ -5,7 +5,9 @@ Multiple professional themes
 Copyright (C) 2024 AnimusUNO
 """
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, NamedTuple
+
+from rich.style import Style
 
 
 @dataclass
@@ -31,6 +33,13 @@ class Palette:
     border: str = "#3e3e42"
 
 
+class TurnStyles(NamedTuple):
+    """Rich styles used to render chat transcript turns."""
+    user_message: Style
+    message: Style
+    meta: Style
+
+
 # Available theme palettes
 THEMES: Dict[str, Dict[str, str]] = {
     "vscode-dark": {
@@ -111,6 +120,8 @@ THEMES: Dict[str, Dict[str, str]] = {
 _palette = Palette()
 _current_theme = "vscode-dark"
 _dark_mode = True
+# Theme name -> prebuilt transcript styles
+_turn_styles: Dict[str, TurnStyles] = {}
 
 
 def get_palette() -> Palette:
@@ -124,6 +135,19 @@ def get_palette() -> Palette:
     
     return _palette
 
+def get_turn_styles() -> TurnStyles:
+    """Get transcript Style objects for the current theme, built once per theme."""
+    styles = _turn_styles.get(_current_theme)
+    if styles is None:
+        palette = get_palette()
+        styles = TurnStyles(
+            user_message=Style(bold=True, color=palette.text_primary, bgcolor=palette.surface_alt),
+            message=Style(color=palette.text_primary),
+            meta=Style(color=palette.text_secondary),
+        )
+        _turn_styles[_current_theme] = styles
+    return styles
+
 def set_theme(theme_name: str) -> None:
     """Set the active theme by name."""
     global _current_theme, _dark_mode
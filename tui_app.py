@@ -5,11 +5,12 @@ Maps beautiful UI to existing animus-chat functionality
 
 Copyright (C) 2024 AnimusUNO
 """
-import os
-import sys
+import asyncio
 from datetime import datetime
-from dataclasses import dataclass
-from typing import List, Optional
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from textual.app import App, ComposeResult
@@ -17,16 +18,52 @@ from textual.containers import Vertical, Horizontal, ScrollableContainer
 from textual.widgets import Static, Input, Footer
 from textual.binding import Binding
 from textual.message import Message
+from textual.timer import Timer
 from rich.text import Text
 from rich.console import Console
 
 # Import the existing backend functionality
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import config
 from letta_api import letta_client
 
 # Import our UI theme
-from theme import get_palette
+from theme import get_palette, get_turn_styles
+
+
+# Static welcome screen content, built once at import
+WELCOME_LOGO = (
+    "                       ███                               ███████     █████████ \n"
+    "                      ░░░                              ███░░░░░███  ███░░░░░███\n"
+    "  ██████   ████████   ████  █████████████    ██████   ███     ░░███░███    ░░░ \n"
+    " ░░░░░███ ░░███░░███ ░░███ ░░███░░███░░███  ░░░░░███ ░███      ░███░░█████████ \n"
+    "  ███████  ░███ ░███  ░███  ░███ ░███ ░███   ███████ ░███      ░███ ░░░░░░░░███\n"
+    " ███░░███  ░███ ░███  ░███  ░███ ░███ ░███  ███░░███ ░░███     ███  ███    ░███\n"
+    "░░████████ ████ █████ █████ █████░███ █████░░████████ ░░░███████░  ░░█████████ \n"
+    " ░░░░░░░░ ░░░░ ░░░░░ ░░░░░ ░░░░░ ░░░ ░░░░░  ░░░░░░░░    ░░░░░░░     ░░░░░░░░░  \n"
+)
+WELCOME_TITLE = "                                  animaOS v0.1.0\n"
+WELCOME_COMMANDS = (
+    "                   ────────────────────────────────────────────\n"
+    "                         /new      new session    ctrl+n\n"
+    "                         /help     show help      ctrl+h\n"
+    "                         /agents   list agents    ctrl+a\n"
+    "                         /models   list models    ctrl+m\n"
+    "                                  /quit     exit\n"
+    "                   ────────────────────────────────────────────\n"
+    "                        Type a message to begin chatting.\n"
+)
+
+HELP_TEXT = """Commands:
+  /help     - Show this help
+  /status   - Show connection status
+  /agents   - List available agents
+  /agent <id> - Set agent by ID or number
+  /clear    - Clear screen
+  /reasoning - Toggle reasoning/thinking display
+  /quit     - Exit the application
+
+Note: Use /agent 5 to select agent #5 from the list
+Note: Use --reasoning flag to enable reasoning by default"""
 
 
 @dataclass
@@ -35,15 +72,38 @@ class ChatTurn:
     content: str
     timestamp: datetime
     agent_name: str = None
+    # "HH:MM" label, formatted once when the turn is created
+    time_str: str = field(init=False, repr=False, compare=False)
+    # Rendered Text for this turn, dropped whenever content or theme changes
+    _rendered: Optional[Text] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.time_str = self.timestamp.strftime("%H:%M")
 
 
 class ChatTranscript(ScrollableContainer):
     """Enhanced chat display that preserves backend functionality."""
 
-    def __init__(self) -> None:
+    # Minimum delay between transcript refreshes while streaming (~20/s)
+    STREAM_REFRESH_INTERVAL = 0.05
+    # Number of turns kept in the transcript; older turns are dropped
+    MAX_TURNS = 500
+
+    def __init__(self, display_name: str = "User", max_turns: int = MAX_TURNS) -> None:
         super().__init__()
-        self._turns: List[ChatTurn] = []
+        self._display_name = display_name
+        self._turns: Deque[ChatTurn] = deque(maxlen=max_turns)
+        # Finalized turns are kept pre-rendered in _prefix so streaming
+        # updates only re-render the last turn (_tail)
+        self._prefix = Text()
+        self._tail = Text()
+        # Streaming updates are coalesced and applied at most every
+        # STREAM_REFRESH_INTERVAL seconds
+        self._pending_parts: List[str] = []
+        self._flush_handle: Optional[Timer] = None
         self._content_widget = Static("", id="chat_content")
+        # (theme name, banner Text) for the static part of the welcome screen
+        self._welcome_cache: Optional[Tuple[str, Text]] = None
         self._show_welcome = True
         self.can_focus = True
 
@@ -51,7 +111,10 @@ class ChatTranscript(ScrollableContainer):
         yield self._content_widget
 
     def clear(self) -> None:
+        self._cancel_pending()
         self._turns.clear()
+        self._prefix = Text()
+        self._tail = Text()
         self._content_widget.update("")
         self._show_welcome = True
         self.refresh()
@@ -62,17 +125,74 @@ class ChatTranscript(ScrollableContainer):
         turn = ChatTurn(role=role, content=content, timestamp=datetime.now())
         if agent_name and role == "agent":
             turn.agent_name = agent_name
-        self._turns.append(turn)
+        # Apply any throttled update before the last turn is finalized
+        self._flush_tail()
         self._show_welcome = False
-        self._render_turns()
+        if len(self._turns) == self._turns.maxlen:
+            # The oldest turn falls out of the buffer - rebuild the prefix
+            # from the cached renders of the turns that remain
+            self._turns.append(turn)
+            self._render_turns()
+        else:
+            if self._turns:
+                # The previous last turn is final now - move it into the prefix
+                self._prefix.append_text(self._tail)
+                self._prefix.append("\n\n")
+            self._turns.append(turn)
+            self._tail = self._render_turn(turn)
+            self._update_display()
         # Auto-scroll to bottom
         self.scroll_end()
 
-    def update_last(self, content: str) -> None:
-        """Update the last message (for streaming)."""
+    def extend_last(self, delta: str) -> None:
+        """Append streamed text to the last message.
+
+        Deltas are collected and joined once per refresh instead of
+        rebuilding the whole message string for every chunk, and the
+        refresh runs on a short timer so fast token streams update the
+        transcript a bounded number of times per second.
+        """
+        if delta:
+            self._pending_parts.append(delta)
+            self._schedule_flush()
+
+    def flush(self) -> None:
+        """Show any streamed text still waiting on the refresh timer."""
+        self._flush_tail()
+
+    def _schedule_flush(self) -> None:
+        """Arm the refresh timer unless it is already running."""
+        if self._flush_handle is None:
+            self._flush_handle = self.set_timer(self.STREAM_REFRESH_INTERVAL, self._flush_tail)
+
+    def _flush_tail(self) -> None:
+        """Apply the pending streaming update, if any, right away."""
+        if self._flush_handle is not None:
+            self._flush_handle.stop()
+            self._flush_handle = None
+        if not self._pending_parts:
+            return
+        delta = "".join(self._pending_parts)
+        self._pending_parts.clear()
         if self._turns:
-            self._turns[-1].content = content
-            self._render_turns()
+            self._apply_last(self._turns[-1].content + delta)
+
+    def _cancel_pending(self) -> None:
+        """Drop any pending streaming update without applying it."""
+        if self._flush_handle is not None:
+            self._flush_handle.stop()
+            self._flush_handle = None
+        self._pending_parts.clear()
+
+    def _apply_last(self, content: str) -> None:
+        """Replace the content of the last message and re-render it."""
+        if self._turns:
+            turn = self._turns[-1]
+            turn.content = content
+            turn._rendered = None
+            self._tail = self._render_turn(turn)
+            self._update_display()
+            self.scroll_end(animate=False)
 
     def show_welcome(self) -> None:
         """Display the welcome screen."""
@@ -80,78 +200,144 @@ class ChatTranscript(ScrollableContainer):
         palette = get_palette()
         
         self._show_welcome = True
+        self._cancel_pending()
         self._turns.clear()
-        
-        welcome_text = Text()
-        welcome_text.append("\n")
-        welcome_text.append("                       ███                               ███████     █████████ \n", style=f"{palette.accent}")
-        welcome_text.append("                      ░░░                              ███░░░░░███  ███░░░░░███\n", style=f"{palette.accent}")
-        welcome_text.append("  ██████   ████████   ████  █████████████    ██████   ███     ░░███░███    ░░░ \n", style=f"{palette.accent}")
-        welcome_text.append(" ░░░░░███ ░░███░░███ ░░███ ░░███░░███░░███  ░░░░░███ ░███      ░███░░█████████ \n", style=f"{palette.accent}")
-        welcome_text.append("  ███████  ░███ ░███  ░███  ░███ ░███ ░███   ███████ ░███      ░███ ░░░░░░░░███\n", style=f"{palette.accent}")
-        welcome_text.append(" ███░░███  ░███ ░███  ░███  ░███ ░███ ░███  ███░░███ ░░███     ███  ███    ░███\n", style=f"{palette.accent}")
-        welcome_text.append("░░████████ ████ █████ █████ █████░███ █████░░████████ ░░░███████░  ░░█████████ \n", style=f"{palette.accent}")
-        welcome_text.append(" ░░░░░░░░ ░░░░ ░░░░░ ░░░░░ ░░░░░ ░░░ ░░░░░  ░░░░░░░░    ░░░░░░░     ░░░░░░░░░  \n", style=f"{palette.accent}")
-        welcome_text.append("\n\n")
-        welcome_text.append("                                  animaOS v0.1.0\n", style=f"bold {palette.text_primary}")
-        welcome_text.append("                   ────────────────────────────────────────────\n", style=f"{palette.text_secondary}")
-        welcome_text.append("                         /new      new session    ctrl+n\n", style=f"{palette.text_secondary}")
-        welcome_text.append("                         /help     show help      ctrl+h\n", style=f"{palette.text_secondary}")
-        welcome_text.append("                         /agents   list agents    ctrl+a\n", style=f"{palette.text_secondary}")
-        welcome_text.append("                         /models   list models    ctrl+m\n", style=f"{palette.text_secondary}")
-        welcome_text.append("                                  /quit     exit\n", style=f"{palette.text_secondary}")
-        welcome_text.append("                   ────────────────────────────────────────────\n", style=f"{palette.text_secondary}")
-        welcome_text.append("                        Type a message to begin chatting.\n", style=f"{palette.text_secondary}")
-        welcome_text.append("\n")
+        self._prefix = Text()
+        self._tail = Text()
         
         # Check connection status
         if letta_client.test_connection():
-            welcome_text.append("                               Connected to Letta.\n", style=f"{palette.success}")
+            status = ("                               Connected to Letta.\n", palette.success)
         else:
-            welcome_text.append("                            Connection to Letta failed.\n", style=f"{palette.error}")
-            
-        self._content_widget.update(welcome_text)
+            status = ("                            Connection to Letta failed.\n", palette.error)
+
+        # The banner is shared across calls, so assemble into a new Text
+        # rather than appending to it.
+        self._content_widget.update(Text.assemble(self._welcome_banner(), status))
+
+    def _welcome_banner(self) -> Text:
+        """Build the static part of the welcome screen, cached per theme."""
+        from theme import get_palette, get_current_theme
+        theme_name = get_current_theme()
+        if self._welcome_cache is not None and self._welcome_cache[0] == theme_name:
+            return self._welcome_cache[1]
 
-    def _render_turns(self) -> None:
-        """Render chat messages."""
-        from theme import get_palette
         palette = get_palette()
         
+        welcome_text = Text()
+        welcome_text.append("\n")
+        welcome_text.append(WELCOME_LOGO, style=f"{palette.accent}")
+        welcome_text.append("\n\n")
+        welcome_text.append(WELCOME_TITLE, style=f"bold {palette.text_primary}")
+        welcome_text.append(WELCOME_COMMANDS, style=f"{palette.text_secondary}")
+        welcome_text.append("\n")
+        
+        self._welcome_cache = (theme_name, welcome_text)
+        return welcome_text
+
+    def _render_turns(self, restyle: bool = False) -> None:
+        """Render chat messages.
+
+        Turns keep their rendered Text between calls; pass restyle=True
+        after a theme change to render everything again.
+        """
+        if restyle:
+            for turn in self._turns:
+                turn._rendered = None
+
+        self._prefix = Text()
+        for turn in islice(self._turns, max(len(self._turns) - 1, 0)):
+            self._prefix.append_text(self._render_turn(turn))
+            self._prefix.append("\n\n")
+        self._tail = self._render_turn(self._turns[-1]) if self._turns else Text()
+        self._update_display()
+
+    def _update_display(self) -> None:
+        """Push the finalized prefix and the live tail to the content widget."""
+        self._content_widget.update(Text.assemble(self._prefix, self._tail))
+
+    def _render_turn(self, turn: ChatTurn) -> Text:
+        """Render a single chat turn, reusing the cached Text when present."""
+        if turn._rendered is not None:
+            return turn._rendered
+
+        styles = get_turn_styles()
+        
         display = Text()
         
-        for i, turn in enumerate(self._turns):
-            if i > 0:
-                display.append("\n\n")
-            
-            # Get display name for the role
-            if turn.role.lower() == "user":
-                display_name = os.getenv("DISPLAY_NAME", "User")
-            elif turn.role.lower() == "agent":
-                # Use actual agent name if available
-                display_name = getattr(turn, 'agent_name', None) or "Agent"
-            elif turn.role.lower() == "reasoning":
-                display_name = "Thinking"
-            else:
-                display_name = turn.role.title()
-            
-            # Format timestamp
-            time_str = turn.timestamp.strftime("%H:%M")
-            
-            # Add message content with proper styling
-            if turn.role.lower() == "user":
-                # User message - with background styling
-                lines = turn.content.split('\n')
-                for j, line in enumerate(lines):
-                    if j > 0:
-                        display.append("\n")
-                    display.append(f"  {line}  ", style=f"bold {palette.text_primary} on {palette.surface_alt}")
-                display.append(f"\n{display_name} ({time_str})", style=f"{palette.text_secondary}")
-            else:
-                # Agent message
-                display.append(f"{turn.content}", style=f"{palette.text_primary}")
-                display.append(f"\n{display_name} ({time_str})", style=f"{palette.text_secondary}")
+        # Get display name for the role
+        role = turn.role.lower()
+        if role == "user":
+            display_name = self._display_name
+        elif role == "agent":
+            # Use actual agent name if available
+            display_name = turn.agent_name or "Agent"
+        elif role == "reasoning":
+            display_name = "Thinking"
+        else:
+            display_name = turn.role.title()
+        
+        time_str = turn.time_str
+        
+        # Add message content with proper styling
+        if role == "user":
+            # User message - with background styling
+            lines = turn.content.split('\n')
+            for j, line in enumerate(lines):
+                if j > 0:
+                    display.append("\n")
+                display.append(f"  {line}  ", style=styles.user_message)
+            display.append(f"\n{display_name} ({time_str})", style=styles.meta)
+        else:
+            # Agent message
+            display.append(turn.content, style=styles.message)
+            display.append(f"\n{display_name} ({time_str})", style=styles.meta)
         
-        self._content_widget.update(display)
+        turn._rendered = display
+        return display
+
+
+# Marks the end of a stream passed through _batched
+_STREAM_END = object()
+
+
+async def _batched(stream: AsyncIterator[str]) -> AsyncIterator[List[str]]:
+    """Re-yield a chunk stream as lists of every chunk that has arrived.
+
+    A producer task drains the stream into a queue; each iteration takes
+    everything queued so far, so a fast stream costs one UI update per
+    batch instead of one per chunk. Errors from the stream are re-raised
+    after the chunks that came before them.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            async for chunk in stream:
+                queue.put_nowait(chunk)
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(_STREAM_END)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            batch = []
+            item = await queue.get()
+            while item is not _STREAM_END and not isinstance(item, Exception):
+                batch.append(item)
+                if queue.empty():
+                    break
+                item = queue.get_nowait()
+            if batch:
+                yield batch
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+    finally:
+        producer.cancel()
 
 
 class StatusMessage(Message):
@@ -199,9 +385,21 @@ class AnimaTUIApp(App):
     def __init__(self) -> None:
         super().__init__()
         # Use existing backend
-        self._agents: List[tuple] = []
+        # Agent id -> name, in server order; used for names and numbering
+        self._agents: Dict[str, str] = {}
+        self._display_name = config.display_name
         self._current_streaming = False
         self._show_reasoning = False  # Add reasoning support
+        # Slash command name -> handler taking the command's arguments
+        self._commands: Dict[str, Callable[[List[str]], Awaitable[None]]] = {
+            "help": self._cmd_help,
+            "status": self._cmd_status,
+            "agents": self._cmd_agents,
+            "agent": self._cmd_agent,
+            "clear": self._cmd_clear,
+            "reasoning": self._cmd_reasoning,
+            "quit": self._cmd_quit,
+        }
         
         # Load saved theme preference
         self._load_theme_preference()
@@ -271,7 +469,7 @@ class AnimaTUIApp(App):
 
     def compose(self) -> ComposeResult:
         with Vertical(id="layout"):
-            transcript = ChatTranscript()
+            transcript = ChatTranscript(display_name=self._display_name)
             transcript.id = "transcript"
             yield transcript
             prompt = Input(placeholder="Type your message here...")
@@ -289,10 +487,25 @@ class AnimaTUIApp(App):
         try:
             agents = letta_client.list_agents()
             if agents:
-                self._agents = [(agent["id"], agent["name"]) for agent in agents]
+                self._remember_agents(agents)
         except Exception as e:
             self._emit_system(f"Error loading agents: {e}")
 
+    def _remember_agents(self, agents: List[dict]) -> None:
+        """Index a fetched agent list for name lookups."""
+        self._agents = {
+            agent['id']: agent['name'] for agent in agents
+            if isinstance(agent, dict) and 'id' in agent and 'name' in agent
+        }
+
+    def _agent_name(self, agent_id: str) -> str:
+        """Display name for an agent, reloading the agent list only on a miss."""
+        name = self._agents.get(agent_id)
+        if name is None:
+            self._load_agents()
+            name = self._agents.get(agent_id, "Assistant")
+        return name
+
     def _emit_system(self, message: str) -> None:
         """Add a system message."""
         transcript = self.query_one("#transcript", ChatTranscript)
@@ -306,7 +519,7 @@ class AnimaTUIApp(App):
         if transcript._show_welcome:
             transcript.show_welcome()
         else:
-            transcript._render_turns()
+            transcript._render_turns(restyle=True)
 
     def watch_dark(self, dark: bool) -> None:
         """Called when dark mode changes."""
@@ -320,23 +533,12 @@ class AnimaTUIApp(App):
 
     def action_show_help(self) -> None:
         """Show help information using original help text."""
-        help_text = """Commands:
-  /help     - Show this help
-  /status   - Show connection status
-  /agents   - List available agents
-  /agent <id> - Set agent by ID or number
-  /clear    - Clear screen
-  /reasoning - Toggle reasoning/thinking display
-  /quit     - Exit the application
-
-Note: Use /agent 5 to select agent #5 from the list
-Note: Use --reasoning flag to enable reasoning by default"""
-        self._emit_system(help_text)
+        self._emit_system(HELP_TEXT)
 
     def action_show_agents(self) -> None:
         """List available agents."""
         if self._agents:
-            listing = "\n".join(f"{i+1}. {name} ({agent_id})" for i, (agent_id, name) in enumerate(self._agents))
+            listing = "\n".join(f"{i+1}. {name} ({agent_id})" for i, (agent_id, name) in enumerate(self._agents.items()))
         else:
             listing = "No agents available. Check connection."
         self._emit_system(f"Available agents:\n{listing}")
@@ -369,84 +571,115 @@ Note: Use --reasoning flag to enable reasoning by default"""
         transcript = self.query_one("#transcript", ChatTranscript)
         transcript.append("user", message)
 
-        # Get agent name (exactly like original)
+        # Get agent name from the loaded agent list
         agent_name = "Assistant"  # Default fallback
         if letta_client and letta_client.current_agent_id:
             try:
-                agents = letta_client.list_agents()
-                if agents and isinstance(agents, list):
-                    for agent in agents:
-                        if isinstance(agent, dict) and 'id' in agent and 'name' in agent:
-                            if agent['id'] == letta_client.current_agent_id:
-                                agent_name = agent['name']
-                                break
+                agent_name = self._agent_name(letta_client.current_agent_id)
             except Exception:
                 # If we can't get the agent name, fall back to "Assistant"
                 pass
 
         try:
-            # Use streaming exactly like original simple_chat.py
-            response = ""
+            # Use streaming exactly like original simple_chat.py. The reply
+            # is shown as it streams, so reasoning arriving mid-reply closes
+            # the current agent turn and the content after it opens a new
+            # one; reasoning that arrives after the last content is shown
+            # after the reply
             reasoning_buffer = ""
+            response_open = False  # Whether the last turn is the live agent reply
             
-            async for chunk in letta_client.send_message_stream(message, show_reasoning=self._show_reasoning):
-                if chunk.startswith("__REASONING__:"):
-                    # This is reasoning content - buffer it
-                    reasoning_content = chunk[14:]  # Remove "__REASONING__:" prefix
-                    reasoning_buffer += reasoning_content
-                else:
-                    # This is regular content
-                    # If we have buffered reasoning, display it first
-                    if reasoning_buffer:
-                        transcript.append("reasoning", f"[Thinking] {reasoning_buffer}")
-                        reasoning_buffer = ""
-                    
-                    response += chunk
+            stream = letta_client.send_message_stream(message, show_reasoning=self._show_reasoning)
+            async for batch in _batched(stream):
+                # Consecutive content chunks in a batch go in with one append
+                content_parts = []
+                for chunk in batch:
+                    if chunk.startswith("__REASONING__:"):
+                        # This is reasoning content - buffer it
+                        reasoning_content = chunk[14:]  # Remove "__REASONING__:" prefix
+                        reasoning_buffer += reasoning_content
+                    else:
+                        # This is regular content
+                        # If we have buffered reasoning, display it first
+                        if reasoning_buffer:
+                            if content_parts:
+                                transcript.extend_last("".join(content_parts))
+                                content_parts = []
+                            transcript.append("reasoning", f"[Thinking] {reasoning_buffer}")
+                            reasoning_buffer = ""
+                            response_open = False
+                        
+                        # Stream the response into the transcript as it arrives
+                        if not response_open:
+                            transcript.append("agent", "", agent_name)
+                            response_open = True
+                        content_parts.append(chunk)
+                if content_parts:
+                    transcript.extend_last("".join(content_parts))
             
             # Handle any remaining reasoning buffer
             if reasoning_buffer:
                 transcript.append("reasoning", f"[Thinking] {reasoning_buffer}")
 
-            # Display the complete response with actual agent name
-            if response:
-                transcript.append("agent", response, agent_name)
-
         except Exception as e:
             # Show actual error message like original
             transcript.append("agent", f"Error: {e}", agent_name)
+        finally:
+            # Don't leave the last tokens waiting on the refresh timer
+            transcript.flush()
 
     async def _handle_command(self, command: str) -> None:
         """Handle chat commands using original simple_chat.py logic exactly."""
         parts = command.split()
         cmd = parts[0].lower()
         
-        if cmd == "help":
-            self.action_show_help()
-        elif cmd == "status":
-            self.action_show_status()
-        elif cmd == "agents":
-            await self._list_agents()
-        elif cmd == "agent":
-            if len(parts) > 1:
-                await self._set_agent(parts[1])
-            else:
-                self._emit_system("Usage: /agent <id or number>")
-        elif cmd == "clear":
-            self.action_new_session()
-        elif cmd == "reasoning":
-            self._show_reasoning = not self._show_reasoning
-            status = "enabled" if self._show_reasoning else "disabled"
-            self._emit_system(f"Reasoning display {status}")
-        elif cmd == "quit":
-            self.exit()
+        handler = self._commands.get(cmd)
+        if handler is not None:
+            await handler(parts[1:])
         else:
             self._emit_system(f"Unknown command: /{cmd}. Type /help for available commands.")
 
+    async def _cmd_help(self, args: List[str]) -> None:
+        """Handle /help."""
+        self.action_show_help()
+
+    async def _cmd_status(self, args: List[str]) -> None:
+        """Handle /status."""
+        self.action_show_status()
+
+    async def _cmd_agents(self, args: List[str]) -> None:
+        """Handle /agents."""
+        await self._list_agents()
+
+    async def _cmd_agent(self, args: List[str]) -> None:
+        """Handle /agent <id or number>."""
+        if args:
+            await self._set_agent(args[0])
+        else:
+            self._emit_system("Usage: /agent <id or number>")
+
+    async def _cmd_clear(self, args: List[str]) -> None:
+        """Handle /clear."""
+        self.action_new_session()
+
+    async def _cmd_reasoning(self, args: List[str]) -> None:
+        """Handle /reasoning by toggling the reasoning display."""
+        self._show_reasoning = not self._show_reasoning
+        status = "enabled" if self._show_reasoning else "disabled"
+        self._emit_system(f"Reasoning display {status}")
+
+    async def _cmd_quit(self, args: List[str]) -> None:
+        """Handle /quit."""
+        self.exit()
+
     async def _list_agents(self) -> None:
         """List available agents using original logic."""
         self._emit_system("Fetching available agents...")
+        # An explicit listing always asks the server
+        letta_client.invalidate_agents_cache()
         agents = letta_client.list_agents()
         if agents:
+            self._remember_agents(agents)
             listing = f"Found {len(agents)} agents:\n"
             for i, agent in enumerate(agents, 1):
                 listing += f"  {i}. {agent['name']} (ID: {agent['id']})\n"